@@ -1,5 +1,6 @@
 # authentication/services.py
 
+import asyncio
 from fastapi import HTTPException, status
 from sqlalchemy import or_
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -8,7 +9,7 @@ from app.background.OtpService import OtpService
 from app.models.User import User
 from app.schemas.User import UserCreate, UserCreateResponse
 from app.schemas.Otp import OtpRequest, OtpResponse
-from app.background.celery_app import send_otp_email
+from app.background.dispatch import enqueue
 import logging
 
 logger = logging.getLogger(__name__)
@@ -40,17 +41,19 @@ async def create_new_user(db: AsyncSession, user: UserCreate)->UserCreateRespons
                 status_code=status.HTTP_406_NOT_ACCEPTABLE,
                 detail="Email already exists"
             )
+    # bcrypt releases the GIL, so hashing in a thread keeps the event loop serving and uses spare cores
+    password = await asyncio.to_thread(User.hash_password, user.password)
     new_user = User(
         username=user.username,
         email = user.email,
-        password = User.hash_password(user.password),
+        password = password,
         is_verified = False
     )
     try:
         db.add(new_user)
         await db.commit()
         await db.refresh(new_user)
-        task = send_otp_email.delay(user.email)
+        task = enqueue("otp.send_email", user.email)
         return UserCreateResponse(
             taskID=task.id,
             userID=new_user.id,
@@ -58,7 +61,7 @@ async def create_new_user(db: AsyncSession, user: UserCreate)->UserCreateRespons
         )
     except Exception as e:
         await db.rollback()
-        logger.error(f"Error: create_new_user path -> {str(e)}")
+        logger.error("Error: create_new_user path -> %s", e)
         raise HTTPException(status.HTTP_400_BAD_REQUEST, detail="Error creating new user")
 
 async def verify_the_account(db: AsyncSession, otp_service: OtpService, otp_payload: OtpRequest)->OtpResponse:
@@ -78,6 +81,6 @@ async def verify_the_account(db: AsyncSession, otp_service: OtpService, otp_payl
             )
         except Exception as e:
             await db.rollback()
-            logger.error(f"Error: verify_the_account path -> {str(e)}")
+            logger.error("Error: verify_the_account path -> %s", e)
             raise HTTPException(status.HTTP_400_BAD_REQUEST, detail="Error verifying the OTP")
     raise HTTPException(status.HTTP_409_CONFLICT, detail="Invalid OTP")
@@ -0,0 +1,65 @@
+# authentication/urlSigner.py
+
+import base64
+import binascii
+import hashlib
+import hmac
+import json
+import time
+from dataclasses import dataclass
+from pathlib import PurePosixPath
+from fastapi import HTTPException, status
+from app.config import config
+
+# Own key, derived from SECRET_KEY, so a download signature can never pass as a JWT signature or vice versa.
+_SIGNING_KEY = hmac.new(config.SECRET_KEY.encode("utf-8"), b"signed-download-url/v1", hashlib.sha256).digest()
+
+
+@dataclass(frozen=True)
+class SignedBlob:
+    path: str       # relative to the uploads directory: "{file_id}/{version_id}.ext"
+    check_sum: str
+    expires_at: int
+
+
+def _b64encode(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode("ascii")
+
+
+def _b64decode(data: str) -> bytes:
+    return base64.urlsafe_b64decode(data + "=" * (-len(data) % 4))
+
+
+def _signature(payload: str) -> str:
+    return _b64encode(hmac.new(_SIGNING_KEY, payload.encode("ascii"), hashlib.sha256).digest())
+
+
+def storage_key(storage_path: str) -> str:
+    """Location of a blob relative to the uploads directory, so it survives a different mount point."""
+    return PurePosixPath(*PurePosixPath(storage_path.replace("\\", "/")).parts[-2:]).as_posix()
+
+
+def sign_blob(storage_path: str, check_sum: str, expires_in: int) -> tuple[str, int]:
+    """Token granting read access to one stored blob until it expires. Returns (token, expires_at)."""
+    expires_at = int(time.time()) + expires_in
+    payload = _b64encode(json.dumps(
+        {"p": storage_key(storage_path), "h": check_sum, "e": expires_at},
+        separators=(",", ":"),
+    ).encode("utf-8"))
+    return f"{payload}.{_signature(payload)}", expires_at
+
+
+def verify_blob_token(token: str) -> SignedBlob:
+    invalid = HTTPException(status.HTTP_403_FORBIDDEN, detail="Invalid download link")
+    payload, _, signature = token.partition(".")
+    try:
+        if not hmac.compare_digest(signature, _signature(payload)):
+            raise invalid
+        claims = json.loads(_b64decode(payload))
+        blob = SignedBlob(path=claims["p"], check_sum=claims["h"], expires_at=int(claims["e"]))
+    except (ValueError, KeyError, TypeError, binascii.Error, UnicodeError):
+        raise invalid
+
+    if blob.expires_at < time.time():
+        raise HTTPException(status.HTTP_403_FORBIDDEN, detail="Download link has expired")
+    return blob
@@ -1,11 +1,12 @@
 # background/OtpService.py
 
+import os
 import random
-import smtplib
 from redis import Redis
 from email.message import EmailMessage
 import logging
-from app.infrastructure.redis_client import redis_client
+from app.infrastructure.redis_client import get_redis_client
+from app.background.smtp_pool import SmtpConnectionPool, get_smtp_pool
 from app.config import config
 
 logger = logging.getLogger(__name__)
@@ -13,10 +14,15 @@ logger = logging.getLogger(__name__)
 class OtpSendError(Exception): pass
 
 class OtpService:
-    def __init__(self, redis: Redis, email:str, password:str) -> None:
+    def __init__(self, redis: Redis, email:str, smtp_pool: SmtpConnectionPool | None = None) -> None:
         self.__email = email
-        self.__password = password
         self.__redis = redis
+        self.__smtp_pool = smtp_pool
+
+    @property
+    def smtp_pool(self) -> SmtpConnectionPool:
+        # resolved per call so each (forked) worker process gets its own pool
+        return self.__smtp_pool or get_smtp_pool()
 
     def __generate_code(self)->str:
         return str(random.randint(100000, 999999))
@@ -27,18 +33,19 @@ class OtpService:
     def __delete_the_code(self, to_email:str):
         self.__redis.delete(to_email)
 
-    def __send_email(self, to_email:str, otp:str):
+    def __build_message(self, to_email:str, otp:str)->EmailMessage:
         msg = EmailMessage()
         msg["Subject"] = "Verification CODE"
         msg["from"] = self.__email
         msg["to"] = to_email
         msg.set_content(f"Your OTP is {otp}\n\nThis code will expire in 5 minutes.")
+        return msg
+
+    def __send_email(self, to_email:str, otp:str):
         try:
-            with smtplib.SMTP_SSL("smtp.gmail.com", 465) as smtp:
-                smtp.login(self.__email, self.__password)
-                smtp.send_message(msg)
+            self.smtp_pool.send(self.__build_message(to_email, otp))
         except Exception as e:
-            logger.error(f"SMTP error: {str(e)}")
+            logger.error("SMTP error: %s", e)
             raise OtpSendError("Failed to send email")
 
     def verify_code(self, to_email:str, verification_code:str)->bool:
@@ -57,13 +64,16 @@ class OtpService:
             return {"status":"SUCCESS", "otp":otp}
         except Exception as e:
             self.__delete_the_code(to_email)
-            logger.error(f"Error sending OTP: {str(e)}")
+            logger.error("Error sending OTP: %s", e)
             raise OtpSendError("Failed to send email OTP")
 
 _otp_instance = None
+_otp_pid: int | None = None
 
 def get_otp_service():
-    global _otp_instance
-    if _otp_instance is None:
-        _otp_instance = OtpService(redis=redis_client, email=config.MAIL_ACCOUNT, password=config.MAIL_PASSWORD)
+    """Per process, like the SMTP pool: a forked child gets its own Redis client."""
+    global _otp_instance, _otp_pid
+    if _otp_instance is None or _otp_pid != os.getpid():
+        _otp_instance = OtpService(redis=get_redis_client(), email=config.MAIL_ACCOUNT)
+        _otp_pid = os.getpid()
     return _otp_instance
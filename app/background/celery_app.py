@@ -1,7 +1,12 @@
 # background/celery_app.py
 
 from celery import Celery
+from celery.signals import worker_process_shutdown
+from app.background.integrity_scrubber import run_scrub
 from app.background.OtpService import OtpSendError, get_otp_service
+from app.background.search_indexer import index_version, reindex_all
+from app.background.worker_db import run_async
+from app.background.smtp_pool import close_smtp_pool
 from app.config import config
 
 celery_app = Celery(
@@ -9,6 +14,11 @@ celery_app = Celery(
     broker=config.CELERY_BROKER_URL,
     backend=config.CELERY_BACKEND_URL
 )
+celery_app.conf.task_always_eager = config.CELERY_TASK_ALWAYS_EAGER
+# run with `celery -A app.background.celery_app beat`
+celery_app.conf.beat_schedule = {
+    "integrity-scrub": {"task": "integrity.scrub", "schedule": config.SCRUB_INTERVAL_SECONDS},
+}
 
 @celery_app.task(name="otp.send_email")
 def send_otp_email(to_email:str):
@@ -18,3 +28,24 @@ def send_otp_email(to_email:str):
         return {"status": "success"}
     except OtpSendError as e:
         return {"status": "failed", "error": str(e)}
+
+@celery_app.task(name="search.index_version")
+def index_file_version(version_id:str):
+    """Bring the search index up to a newly committed version."""
+    # None when eager mode scheduled it on the API's loop
+    return {"status": run_async(index_version(version_id)) or "scheduled"}
+
+@celery_app.task(name="search.reindex_all")
+def reindex_all_files():
+    """Queue indexing of every current version, e.g. after enabling search on an existing database."""
+    return {"status": "queued", "versions": run_async(reindex_all(index_file_version.delay))}
+
+@celery_app.task(name="integrity.scrub")
+def scrub_blobs(max_seconds:float|None=None):
+    """Re-hash stored blobs from the checkpoint on, recording missing and corrupted ones."""
+    # stays under the beat interval, so runs don't overlap
+    return run_async(run_scrub(max_seconds or config.SCRUB_MAX_RUNTIME_SECONDS)) or {"status": "scheduled"}
+
+@worker_process_shutdown.connect
+def _close_smtp_connections(**kwargs):
+    close_smtp_pool()
@@ -0,0 +1,10 @@
+# background/dispatch.py
+
+def enqueue(task_name: str, *args):
+    """
+    Queue a Celery task by name, like task.delay() (task_always_eager included).
+    The Celery app, and kombu with it, is imported on the first call rather
+    than when the API is imported.
+    """
+    from app.background.celery_app import celery_app
+    return celery_app.tasks[task_name].delay(*args)
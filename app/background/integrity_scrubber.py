@@ -0,0 +1,202 @@
+# background/integrity_scrubber.py
+
+import asyncio
+import hashlib
+import logging
+import mmap
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Optional
+from sqlalchemy import update
+from sqlalchemy.future import select
+from app.background.worker_db import get_worker_sessionmaker
+from app.config import config
+from app.models.FileVersion import FileVersion
+from app.models.IntegrityIssue import BLOB_MISMATCH, BLOB_MISSING, BLOB_UNREADABLE, IntegrityIssue
+from app.models.ScrubCheckpoint import ScrubCheckpoint
+
+logger = logging.getLogger(__name__)
+
+CHECKPOINT = "blobs"
+CHUNK_SIZE = 1024 * 1024
+
+
+class ByteRateLimiter:
+    """
+    Token bucket over bytes read, shared by all hashing threads. A caller
+    takes its bytes up front and sleeps off any debt outside the lock, so
+    threads queue behind each other instead of bursting. A rate of 0 or
+    less disables throttling.
+    """
+
+    def __init__(self, bytes_per_second: int):
+        self.rate = bytes_per_second
+        self._tokens = float(CHUNK_SIZE)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, amount: int):
+        if self.rate <= 0:
+            return
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(CHUNK_SIZE, self._tokens + (now - self._updated) * self.rate) - amount
+            self._updated = now
+            wait = -self._tokens / self.rate
+        if wait > 0:
+            time.sleep(wait)
+
+
+@dataclass(frozen=True)
+class BlobCheck:
+    version_id: str
+    storage_path: str
+    expected_check_sum: str
+    actual_check_sum: Optional[str]     # None when the blob is missing or unreadable
+    size: int
+    unreadable: bool = False
+
+    @property
+    def problem(self) -> Optional[str]:
+        if self.unreadable:
+            return BLOB_UNREADABLE
+        if self.actual_check_sum is None:
+            return BLOB_MISSING
+        if self.actual_check_sum != self.expected_check_sum:
+            return BLOB_MISMATCH
+        return None
+
+
+def hash_blob(path: str, limiter: ByteRateLimiter) -> tuple[Optional[str], int, bool]:
+    """
+    SHA-256 of a stored blob, its size and whether it was unreadable:
+    (None, 0, False) if it is missing, (None, 0, True) on any other OSError
+    so one bad path can't stop the pass. The file is mmapped and hashed a
+    chunk at a time without copying; the limiter is charged per chunk.
+    hashlib drops the GIL on large updates, so several threads hash in
+    parallel.
+    """
+    digest = hashlib.sha256()
+    try:
+        with open(path, "rb") as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                return digest.hexdigest(), 0, False
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped, memoryview(mapped) as view:
+                for offset in range(0, len(view), CHUNK_SIZE):
+                    with view[offset:offset + CHUNK_SIZE] as chunk:
+                        limiter.acquire(len(chunk))
+                        digest.update(chunk)
+                return digest.hexdigest(), len(view), False
+    except FileNotFoundError:
+        return None, 0, False
+    except OSError as exc:
+        logger.warning("Could not read blob %s: %s", path, exc)
+        return None, 0, True
+
+
+async def record_checks(db, checkpoint: Optional[ScrubCheckpoint], checks: list[BlobCheck], pass_completed: bool) -> ScrubCheckpoint:
+    """Advance the checkpoint past `checks` and file or resolve their issues, in one transaction."""
+    now = datetime.now(timezone.utc)
+    if checkpoint is None:
+        checkpoint = ScrubCheckpoint(name=CHECKPOINT, passes_completed=0, blobs_checked=0, bytes_checked=0)
+        db.add(checkpoint)
+    if checkpoint.cursor is None:
+        checkpoint.pass_started_at = now
+    checkpoint.blobs_checked += len(checks)
+    checkpoint.bytes_checked += sum(check.size for check in checks)
+    checkpoint.updated_at = now
+    if pass_completed:
+        checkpoint.cursor = None
+        checkpoint.passes_completed += 1
+        checkpoint.last_pass_completed_at = now
+    else:
+        checkpoint.cursor = checks[-1].version_id
+    # the checkpoint write goes first, so the transaction holds SQLite's write lock from the start
+    await db.flush()
+
+    intact = [check.version_id for check in checks if check.problem is None]
+    if intact:
+        await db.execute(
+            update(IntegrityIssue)
+            .where(IntegrityIssue.version_id.in_(intact), IntegrityIssue.resolved_at.is_(None))
+            .values(resolved_at=now, last_checked_at=now)
+        )
+
+    for check in checks:
+        if check.problem is None:
+            continue
+        issue = await db.get(IntegrityIssue, check.version_id)
+        if issue is None or issue.resolved_at is not None:
+            logger.error("Blob of version %s is %s: %s", check.version_id, check.problem, check.storage_path)
+        if issue is None:
+            issue = IntegrityIssue(version_id=check.version_id, detected_at=now)
+            db.add(issue)
+        elif issue.resolved_at is not None:
+            issue.detected_at, issue.resolved_at = now, None
+        issue.kind = check.problem
+        issue.storage_path = check.storage_path
+        issue.expected_check_sum = check.expected_check_sum
+        issue.actual_check_sum = check.actual_check_sum
+        issue.last_checked_at = now
+
+    await db.commit()
+    return checkpoint
+
+
+async def scrub_batch(executor: ThreadPoolExecutor, limiter: ByteRateLimiter, batch_size: int) -> dict:
+    """Verify the next `batch_size` versions after the checkpoint."""
+    async with get_worker_sessionmaker()() as db:
+        checkpoint = await db.get(ScrubCheckpoint, CHECKPOINT)
+        query = select(FileVersion.id, FileVersion.storage_path, FileVersion.check_sum).order_by(FileVersion.id).limit(batch_size)
+        if checkpoint and checkpoint.cursor:
+            query = query.where(FileVersion.id > checkpoint.cursor)
+        rows = (await db.execute(query)).all()
+        # nothing is held while hashing
+        await db.commit()
+
+        loop = asyncio.get_running_loop()
+        hashes = await asyncio.gather(*(
+            loop.run_in_executor(executor, hash_blob, row.storage_path, limiter) for row in rows
+        ))
+        checks = [
+            BlobCheck(row.id, row.storage_path, row.check_sum, actual, size, unreadable)
+            for row, (actual, size, unreadable) in zip(rows, hashes)
+        ]
+        pass_completed = len(rows) < batch_size
+        await record_checks(db, checkpoint, checks, pass_completed)
+
+    return {
+        "checked": len(checks),
+        "bytes": sum(check.size for check in checks),
+        "problems": sum(check.problem is not None for check in checks),
+        "pass_completed": pass_completed,
+    }
+
+
+async def run_scrub(max_seconds: float) -> dict:
+    """
+    Scrub batches until the current pass completes or `max_seconds` is up;
+    the checkpoint lets the next run continue where this one stopped.
+    """
+    limiter = ByteRateLimiter(config.SCRUB_BYTES_PER_SECOND)
+    deadline = time.monotonic() + max_seconds
+    totals = {"checked": 0, "bytes": 0, "problems": 0, "pass_completed": False}
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=config.SCRUB_THREADS, thread_name_prefix="scrub") as executor:
+        while True:
+            batch = await scrub_batch(executor, limiter, config.SCRUB_BATCH_SIZE)
+            for key in ("checked", "bytes", "problems"):
+                totals[key] += batch[key]
+            if batch["pass_completed"] or time.monotonic() >= deadline:
+                totals["pass_completed"] = batch["pass_completed"]
+                break
+    totals["duration_s"] = round(time.perf_counter() - started, 3)
+    logger.info(
+        "Integrity scrub checked %s blobs (%s bytes) in %ss, %s problems",
+        totals["checked"], totals["bytes"], totals["duration_s"], totals["problems"],
+    )
+    return totals
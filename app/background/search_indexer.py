@@ -0,0 +1,76 @@
+# background/search_indexer.py
+
+import logging
+from sqlalchemy.future import select
+from app.background.worker_db import get_worker_sessionmaker
+from app.config import config
+from app.infrastructure.file_storage import fetch_local_file
+from app.infrastructure.search_index import SearchDocument, get_search_index
+from app.models.File import File
+from app.models.FileVersion import FileVersion
+
+logger = logging.getLogger(__name__)
+
+
+def extract_text(path, max_bytes: int) -> str:
+    """
+    Text of a stored blob for indexing: the first `max_bytes`, decoded as
+    UTF-8. Anything with NUL bytes is treated as binary and contributes no
+    text, so the file is still found by name.
+    """
+    with open(path, "rb") as f:
+        data = f.read(max_bytes)
+    if b"\x00" in data:
+        return ""
+    return data.decode("utf-8", errors="ignore")
+
+
+async def index_version(version_id: str) -> str:
+    """
+    Make `version_id` the indexed document of its file, if it is still the
+    current version. Returns what happened, for the task result and logs.
+    """
+    async with get_worker_sessionmaker()() as db:
+        # plain columns: loading the ORM objects would pull in the whole version history
+        query = (
+            select(FileVersion.file_id, FileVersion.version_number, FileVersion.is_current, FileVersion.storage_path, File.user_id, File.file_name)
+            .join(File, File.id == FileVersion.file_id)
+            .where(FileVersion.id == version_id)
+        )
+        row = (await db.execute(query)).first()
+        # end the read before the index write, SQLite won't upgrade it under contention
+        await db.commit()
+        if row is None:
+            return "missing"
+        if not row.is_current:
+            # a newer upload queued its own indexing
+            return "superseded"
+
+        path = await fetch_local_file(row.storage_path)
+        if path is None:
+            logger.error("Cannot index version %s: blob %s is missing", version_id, row.storage_path)
+            return "missing_blob"
+
+        doc = SearchDocument(
+            file_id=row.file_id,
+            user_id=row.user_id,
+            file_name=row.file_name,
+            version_id=version_id,
+            version_number=row.version_number,
+            body=extract_text(path, config.SEARCH_MAX_INDEX_BYTES),
+        )
+        written = await get_search_index(db.bind.dialect.name).upsert(db, doc)
+        await db.commit()
+
+    logger.debug("Search index for file %s: version %s %s", doc.file_id, version_id, "indexed" if written else "already newer")
+    return "indexed" if written else "stale"
+
+
+async def reindex_all(dispatch) -> int:
+    """Pass every current version to `dispatch` (the indexing task's delay). Returns how many."""
+    async with get_worker_sessionmaker()() as db:
+        result = await db.execute(select(FileVersion.id).where(FileVersion.is_current == True))
+        version_ids = result.scalars().all()
+    for version_id in version_ids:
+        dispatch(version_id)
+    return len(version_ids)
@@ -0,0 +1,188 @@
+# background/smtp_pool.py
+
+import logging
+import os
+import smtplib
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from email.message import EmailMessage
+from app.config import config
+
+logger = logging.getLogger(__name__)
+
+# Errors after which a connection can't be trusted any more.
+_BROKEN_CONNECTION_ERRORS = (smtplib.SMTPServerDisconnected, smtplib.SMTPResponseException, OSError)
+
+
+class _PooledConnection:
+    def __init__(self, smtp: smtplib.SMTP) -> None:
+        self.smtp = smtp
+        self.last_used = time.monotonic()
+        self.reused = False
+
+
+class SmtpConnectionPool:
+    """
+    Keeps authenticated SMTP connections open between sends.
+
+    A connection is taken from the pool (newest first), probed with NOOP if
+    it sat idle longer than `keepalive`, dropped if idle longer than
+    `max_idle`, and put back after a successful send. Connections that fail
+    mid-send are discarded; a send that failed on a reused connection is
+    retried once on a fresh one, since the server may have closed it.
+    `size=0` disables pooling: one connection per send, as before.
+    """
+
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        username: str,
+        password: str,
+        use_ssl: bool = True,
+        starttls: bool = False,
+        size: int = 2,
+        keepalive: float = 30,
+        max_idle: float = 240,
+        timeout: float = 10,
+    ) -> None:
+        self.host = host
+        self.port = port
+        self.use_ssl = use_ssl
+        self.starttls = starttls
+        self.size = size
+        self.keepalive = keepalive
+        self.max_idle = max_idle
+        self.timeout = timeout
+        self.__username = username
+        self.__password = password
+        self.__idle: list[_PooledConnection] = []
+        self.__lock = threading.Lock()
+        self.__slots = threading.BoundedSemaphore(size) if size > 0 else nullcontext()
+        self.stats = {"connections_opened": 0, "connections_reused": 0, "messages_sent": 0, "reconnects": 0}
+
+    def __connect(self) -> _PooledConnection:
+        if self.use_ssl:
+            smtp = smtplib.SMTP_SSL(self.host, self.port, timeout=self.timeout)
+        else:
+            smtp = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+            if self.starttls:
+                smtp.starttls()
+        try:
+            if self.__username:
+                smtp.login(self.__username, self.__password)
+        except Exception:
+            self.__close(smtp)
+            raise
+        self.stats["connections_opened"] += 1
+        return _PooledConnection(smtp)
+
+    @staticmethod
+    def __close(smtp: smtplib.SMTP):
+        try:
+            smtp.quit()
+        except Exception:
+            smtp.close()
+
+    def __is_alive(self, conn: _PooledConnection) -> bool:
+        idle = time.monotonic() - conn.last_used
+        if idle > self.max_idle:
+            return False
+        if idle <= self.keepalive:
+            return True
+        try:
+            return conn.smtp.noop()[0] == 250
+        except _BROKEN_CONNECTION_ERRORS:
+            return False
+
+    def __checkout(self) -> _PooledConnection:
+        while True:
+            with self.__lock:
+                conn = self.__idle.pop() if self.__idle else None
+            if conn is None:
+                return self.__connect()
+            if self.__is_alive(conn):
+                conn.reused = True
+                self.stats["connections_reused"] += 1
+                return conn
+            self.__close(conn.smtp)
+
+    def __checkin(self, conn: _PooledConnection):
+        conn.last_used = time.monotonic()
+        if self.size == 0:
+            self.__close(conn.smtp)
+            return
+        with self.__lock:
+            self.__idle.append(conn)
+
+    @contextmanager
+    def connection(self):
+        """Borrow a connection; it is returned to the pool unless it broke."""
+        with self.__slots:
+            conn = self.__checkout()
+            try:
+                yield conn
+            except _BROKEN_CONNECTION_ERRORS:
+                self.__close(conn.smtp)
+                raise
+            except BaseException:
+                self.__checkin(conn)
+                raise
+            self.__checkin(conn)
+
+    def __send_on(self, conn: _PooledConnection, msg: EmailMessage):
+        try:
+            conn.smtp.send_message(msg)
+        except _BROKEN_CONNECTION_ERRORS:
+            if not conn.reused:
+                raise
+            # stale pooled connection, reconnect and try once more
+            logger.info("Pooled SMTP connection to %s went stale, reconnecting", self.host)
+            self.__close(conn.smtp)
+            self.stats["reconnects"] += 1
+            fresh = self.__connect()
+            conn.smtp, conn.reused = fresh.smtp, False
+            conn.smtp.send_message(msg)
+        self.stats["messages_sent"] += 1
+
+    def send(self, msg: EmailMessage):
+        with self.connection() as conn:
+            self.__send_on(conn, msg)
+
+    def close(self):
+        with self.__lock:
+            idle, self.__idle = self.__idle, []
+        for conn in idle:
+            self.__close(conn.smtp)
+
+
+_pool: SmtpConnectionPool | None = None
+_pool_pid: int | None = None
+
+
+def get_smtp_pool() -> SmtpConnectionPool:
+    """Per-process pool; a forked Celery child never reuses its parent's sockets."""
+    global _pool, _pool_pid
+    if _pool is None or _pool_pid != os.getpid():
+        _pool = SmtpConnectionPool(
+            host=config.SMTP_HOST,
+            port=config.SMTP_PORT,
+            username=config.MAIL_ACCOUNT,
+            password=config.MAIL_PASSWORD,
+            use_ssl=config.SMTP_USE_SSL,
+            starttls=config.SMTP_STARTTLS,
+            size=config.SMTP_POOL_SIZE,
+            keepalive=config.SMTP_KEEPALIVE_SECONDS,
+            max_idle=config.SMTP_MAX_IDLE_SECONDS,
+            timeout=config.SMTP_TIMEOUT,
+        )
+        _pool_pid = os.getpid()
+    return _pool
+
+
+def close_smtp_pool():
+    global _pool
+    if _pool is not None and _pool_pid == os.getpid():
+        _pool.close()
+    _pool = None
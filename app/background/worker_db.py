@@ -0,0 +1,48 @@
+# background/worker_db.py
+
+import asyncio
+import os
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import NullPool
+from app.config import config
+from app.database import connect_args
+
+_sessionmaker: async_sessionmaker | None = None
+_sessionmaker_pid: int | None = None
+# eager-mode tasks running on the API loop, referenced until done
+_scheduled: set[asyncio.Task] = set()
+
+
+def get_worker_sessionmaker() -> async_sessionmaker:
+    """
+    Sessions for Celery tasks. Every task runs its own event loop (see
+    run_async), and pooled asyncio connections can't outlive their loop, so
+    the engine opens a fresh connection per session (NullPool). Per process,
+    like the SMTP pool, so a forked worker child never shares its parent's.
+    """
+    global _sessionmaker, _sessionmaker_pid
+    if _sessionmaker is None or _sessionmaker_pid != os.getpid():
+        engine = create_async_engine(config.DATABASE_URL, poolclass=NullPool, connect_args=connect_args)
+        _sessionmaker = async_sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False)
+        _sessionmaker_pid = os.getpid()
+    return _sessionmaker
+
+
+def run_async(coro):
+    """
+    Run a coroutine from synchronous task code and return its result.
+
+    In a worker there is no running loop and this is just asyncio.run. With
+    task_always_eager the task body is called from inside the API's event
+    loop, which must not block on it (the coroutine may need a lock held by
+    a request parked on that same loop), so it is scheduled there instead
+    and None is returned.
+    """
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coro)
+    task = loop.create_task(coro)
+    _scheduled.add(task)
+    task.add_done_callback(_scheduled.discard)
+    return None
@@ -0,0 +1,26 @@
+# blob_app.py
+
+# Download-only app for signed URLs (see routes/blobRoutes.py). It never
+# touches the database, so it can be scaled separately from the API:
+#   uvicorn app.blob_app:app --workers 4
+# and pointed at by BLOB_BASE_URL. It needs the same SECRET_KEY and a view
+# of the same uploads directory as the API.
+
+from contextlib import asynccontextmanager
+from fastapi import FastAPI
+from app.logging_config import RequestContextMiddleware, setup_logging, shutdown_logging
+from app.routes.blobRoutes import blob_router
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    setup_logging()
+    yield
+    shutdown_logging()
+
+app = FastAPI(lifespan=lifespan)
+app.add_middleware(RequestContextMiddleware)
+app.include_router(blob_router)
+
+@app.get("/")
+def root():
+    return {"message": "blob server is online"}
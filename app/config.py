@@ -3,16 +3,73 @@
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 class AppSetting(BaseSettings):
+    WEB_HOST: str = "localhost"
+    WEB_PORT: int = 8000
+    WEB_WORKERS: int = 0                # API processes started by `python -m app.main`, 0 = one per CPU
+    WEB_RELOAD: bool = False            # one auto-reloading process instead, for development
+    HASH_IN_THREAD_BYTES: int = 64 * 1024  # uploads at least this large are checksummed off the event loop
+
     DATABASE_URL: str = ""
+    SQLITE_BUSY_TIMEOUT_SECONDS: float = 30
+    DB_WARM_CONNECTIONS: int = 2        # pooled connections opened before /ready reports ready
     SECRET_KEY : str = ""
     JWT_ALGORITHM: str = ""
     MAIL_ACCOUNT: str = ""
     MAIL_PASSWORD: str = ""
     MAX_FILE_SIZE: int = 10 * 1024 * 1024
 
+    SMTP_HOST: str = "smtp.gmail.com"
+    SMTP_PORT: int = 465
+    SMTP_USE_SSL: bool = True
+    SMTP_STARTTLS: bool = False         # only used when SMTP_USE_SSL is off
+    SMTP_TIMEOUT: float = 10
+    SMTP_POOL_SIZE: int = 2             # connections kept per worker process, 0 = connect per email
+    SMTP_KEEPALIVE_SECONDS: int = 30    # idle connections older than this are NOOP-probed before reuse
+    SMTP_MAX_IDLE_SECONDS: int = 240    # and dropped after this
+
     REDIS_URL: str = ""
     CELERY_BROKER_URL: str = ""
     CELERY_BACKEND_URL: str = ""
+    CELERY_TASK_ALWAYS_EAGER: bool = False  # run tasks inline in the calling process, for development and benchmarks
+
+    UPLOAD_MAX_CONCURRENT: int = 32
+    UPLOAD_MAX_BYTES_IN_FLIGHT: int = 256 * 1024 * 1024
+    UPLOAD_MAX_CONCURRENT_PER_USER: int = 4
+    UPLOAD_MAX_BYTES_IN_FLIGHT_PER_USER: int = 40 * 1024 * 1024
+    UPLOAD_LEASE_SECONDS: int = 120     # a crashed worker's reservation is freed after this
+    UPLOAD_RETRY_AFTER_SECONDS: int = 1
+
+    VERSION_CACHE_LOCAL_ENTRIES: int = 10_000
+    VERSION_CACHE_TTL_SECONDS: int = 24 * 60 * 60     # specific versions are immutable, TTL only bounds memory
+    VERSION_CACHE_CURRENT_TTL_SECONDS: int = 30
+
+    BLOB_CACHE_MAX_BYTES: int = 64 * 1024 * 1024     # 0 disables the in-memory blob cache
+    BLOB_CACHE_MAX_ENTRIES: int = 1024
+    BLOB_CACHE_MAX_BLOB_SIZE: int = 256 * 1024       # larger versions are always streamed from disk
+
+    CHANGES_PAGE_SIZE: int = 100
+    CHANGES_MAX_PAGE_SIZE: int = 1000
+    CHANGES_MAX_WAIT_SECONDS: int = 30  # long-poll cap for GET /file/changes
+
+    SIGNED_URL_TTL_SECONDS: int = 300
+    BLOB_BASE_URL: str = ""             # where app.blob_app is served, e.g. https://dl.example.com; empty = this API
+
+    SEARCH_MAX_INDEX_BYTES: int = 512 * 1024  # text indexed per version; the rest of a large file is not searchable
+    SEARCH_PAGE_SIZE: int = 20
+    SEARCH_MAX_PAGE_SIZE: int = 100
+
+    SCRUB_INTERVAL_SECONDS: int = 15 * 60       # Celery beat schedule of the integrity scrub
+    SCRUB_MAX_RUNTIME_SECONDS: int = 10 * 60    # per run, keep below the interval
+    SCRUB_BATCH_SIZE: int = 200                 # versions hashed between checkpoints
+    SCRUB_THREADS: int = 4
+    SCRUB_BYTES_PER_SECOND: int = 20 * 1024 * 1024  # read budget shared by the threads, 0 = unthrottled
+
+    METRICS_TOKEN: str = ""         # bearer token for /metrics/*; empty disables them
+
+    LOG_LEVEL: str = "INFO"
+    LOG_FORMAT: str = "json"        # "json" or "text"
+    LOG_SAMPLE_RATE: float = 1.0    # share of requests whose below-WARNING records are kept
+    SQL_ECHO: bool = False
 
     model_config = SettingsConfigDict(env_file=".env", extra="ignore")
 
@@ -1,16 +1,52 @@
 # database.py
 
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
+import logging
+import os
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine, async_sessionmaker
 from sqlalchemy.orm import declarative_base
 from app.config import config
 
-DATABASE_URL = config.DATABASE_URL
-engine = create_async_engine(DATABASE_URL, echo=True, future=True)
+logger = logging.getLogger(__name__)
 
-AsyncSessionLocal = async_sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False)
+DATABASE_URL = config.DATABASE_URL
+# SQL statement logging goes through the regular logging setup, see SQL_ECHO.
+# SQLite serialises writers; let a burst of uploads queue for the write lock instead of failing after the default 5 s
+connect_args = {"timeout": config.SQLITE_BUSY_TIMEOUT_SECONDS} if DATABASE_URL.startswith("sqlite") else {}
 
 Base = declarative_base()
 
+_engine: AsyncEngine | None = None
+_sessionmaker: async_sessionmaker | None = None
+
+def get_engine() -> AsyncEngine:
+    """The engine, created on first use so importing the app opens and configures nothing."""
+    global _engine, _sessionmaker
+    if _engine is None:
+        _engine = create_async_engine(DATABASE_URL, future=True, connect_args=connect_args)
+        _sessionmaker = async_sessionmaker(bind=_engine, class_=AsyncSession, expire_on_commit=False)
+    return _engine
+
+def get_sessionmaker() -> async_sessionmaker:
+    get_engine()
+    return _sessionmaker
+
+async def dispose_engine():
+    """Close pooled connections and forget the engine; the next get_engine() builds a new one."""
+    global _engine, _sessionmaker
+    if _engine is not None:
+        await _engine.dispose()
+        logger.info("Database disposed successfully")
+    _engine = _sessionmaker = None
+
+def _forget_engine_after_fork():
+    # a forked child must not reuse the parent's pooled connections; close=False leaves them to the parent
+    global _engine, _sessionmaker
+    if _engine is not None:
+        _engine.sync_engine.dispose(close=False)
+    _engine = _sessionmaker = None
+
+os.register_at_fork(after_in_child=_forget_engine_after_fork)
+
 async def get_db():
-    async with AsyncSessionLocal() as session:
+    async with get_sessionmaker()() as session:
         yield session
@@ -0,0 +1,20 @@
+# dependencies/Metrics.py
+
+import hmac
+from typing import Annotated
+from fastapi import Depends, HTTPException, status
+from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
+from app.config import config
+
+metrics_scheme = HTTPBearer(auto_error=False)
+
+async def require_metrics_token(credentials: Annotated[HTTPAuthorizationCredentials | None, Depends(metrics_scheme)]):
+    """Operator access to /metrics: the request must carry METRICS_TOKEN as its bearer token."""
+    if not config.METRICS_TOKEN:
+        raise HTTPException(status.HTTP_403_FORBIDDEN, detail="Metrics are disabled")
+    if credentials is None or not hmac.compare_digest(credentials.credentials.encode(), config.METRICS_TOKEN.encode()):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid metrics token",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
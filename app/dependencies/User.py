@@ -26,13 +26,13 @@ async def get_current_user(db: Annotated[AsyncSession, Depends(get_db)], token:
         user_id = payload.get("sub")
 
         if not user_id:
-            logger.error(f"User does not exist: {credentials_exception}")
+            logger.error("User does not exist: %s", credentials_exception)
             raise credentials_exception
     except InvalidTokenError:
-        logger.error(f"Error fetching user by userID: {InvalidTokenError}")
+        logger.error("Error fetching user by userID: %s", InvalidTokenError)
         raise credentials_exception
     except Exception as e:
-        logger.error(f"Error fetching current user: {e}")
+        logger.error("Error fetching current user: %s", e)
         raise credentials_exception
 
     result = await db.execute(select(User).filter_by(id = user_id))
@@ -0,0 +1,149 @@
+# infrastructure/blob_cache.py
+
+from collections import OrderedDict
+from app.config import config
+
+_HALVE = bytes(count >> 1 for count in range(256))
+
+
+class _CountMinSketch:
+    """
+    Approximate access counts in a few KB, whatever the number of keys seen.
+    Counters saturate at 15 and are halved every `sample_size` increments,
+    so popularity that has faded stops protecting an entry.
+    """
+
+    DEPTH = 4
+    MAX_COUNT = 15
+
+    def __init__(self, width: int, sample_size: int) -> None:
+        self.width = 1 << max(width - 1, 1).bit_length()    # power of two, for masking
+        self.sample_size = sample_size
+        self.__rows = [bytearray(self.width) for _ in range(self.DEPTH)]
+        self.__additions = 0
+
+    def __indexes(self, key: str):
+        mask = self.width - 1
+        return [hash((seed, key)) & mask for seed in range(self.DEPTH)]
+
+    def increment(self, key: str):
+        for row, i in zip(self.__rows, self.__indexes(key)):
+            if row[i] < self.MAX_COUNT:
+                row[i] += 1
+        self.__additions += 1
+        if self.__additions >= self.sample_size:
+            self.__age()
+
+    def estimate(self, key: str) -> int:
+        return min(row[i] for row, i in zip(self.__rows, self.__indexes(key)))
+
+    def __age(self):
+        for row in self.__rows:
+            row[:] = row.translate(_HALVE)
+        self.__additions //= 2
+
+    @property
+    def nbytes(self) -> int:
+        return self.DEPTH * self.width
+
+
+class HotBlobCache:
+    """
+    In-process cache of small file contents, keyed by check_sum so versions
+    with identical content share one entry.
+
+    Every lookup is counted in a count-min sketch (TinyLFU). While there is
+    room, any blob up to `max_blob_size` is admitted; once full, a candidate
+    only gets in if it has been requested more often than every LRU entry it
+    would evict, so a burst of one-off downloads can't flush the hot set.
+    Bounded by both `max_bytes` and `max_entries`; `max_bytes=0` disables it.
+    """
+
+    def __init__(self, max_bytes: int, max_entries: int, max_blob_size: int) -> None:
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self.max_blob_size = max_blob_size
+        self.__blobs: OrderedDict[str, bytes] = OrderedDict()
+        self.__bytes = 0
+        self.__sketch = _CountMinSketch(width=max(max_entries, 16) * 4, sample_size=max(max_entries, 16) * 10)
+        self.__stats = {"hits": 0, "misses": 0, "admitted": 0, "rejected": 0, "evicted": 0}
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_bytes > 0 and self.max_entries > 0
+
+    def get(self, check_sum: str) -> bytes | None:
+        """Return the cached blob, counting the access either way."""
+        if not self.enabled:
+            return None
+        self.__sketch.increment(check_sum)
+        blob = self.__blobs.get(check_sum)
+        if blob is None:
+            self.__stats["misses"] += 1
+            return None
+        self.__blobs.move_to_end(check_sum)
+        self.__stats["hits"] += 1
+        return blob
+
+    def __victims(self, check_sum: str, size: int) -> list[str] | None:
+        """LRU entries that would have to go to fit the candidate, or None if it loses to any of them."""
+        if not self.enabled or size > self.max_blob_size or size > self.max_bytes:
+            return None
+        free_bytes = self.max_bytes - self.__bytes
+        free_entries = self.max_entries - len(self.__blobs)
+        if size <= free_bytes and free_entries > 0:
+            return []
+        frequency = self.__sketch.estimate(check_sum)
+        victims = []
+        for key, blob in self.__blobs.items():
+            if size <= free_bytes and free_entries > 0:
+                break
+            if self.__sketch.estimate(key) >= frequency:
+                return None
+            victims.append(key)
+            free_bytes += len(blob)
+            free_entries += 1
+        return victims
+
+    def admits(self, check_sum: str, size: int) -> bool:
+        """Whether a blob of `size` bytes would be admitted now; lets callers skip reading it otherwise."""
+        if check_sum in self.__blobs or self.__victims(check_sum, size) is not None:
+            return True
+        self.__stats["rejected"] += 1
+        return False
+
+    def put(self, check_sum: str, blob: bytes) -> bool:
+        if check_sum in self.__blobs:
+            return True
+        victims = self.__victims(check_sum, len(blob))
+        if victims is None:
+            self.__stats["rejected"] += 1
+            return False
+        for key in victims:
+            self.__bytes -= len(self.__blobs.pop(key))
+            self.__stats["evicted"] += 1
+        self.__blobs[check_sum] = blob
+        self.__bytes += len(blob)
+        self.__stats["admitted"] += 1
+        return True
+
+    def stats(self) -> dict:
+        lookups = self.__stats["hits"] + self.__stats["misses"]
+        return {
+            "enabled": self.enabled,
+            "entries": len(self.__blobs),
+            "bytes": self.__bytes,
+            "max_entries": self.max_entries,
+            "max_bytes": self.max_bytes,
+            "max_blob_size": self.max_blob_size,
+            "sketch_bytes": self.__sketch.nbytes,
+            "hit_rate": round(self.__stats["hits"] / lookups, 4) if lookups else 0.0,
+            **self.__stats,
+        }
+
+
+blob_cache = HotBlobCache(
+    max_bytes=config.BLOB_CACHE_MAX_BYTES,
+    max_entries=config.BLOB_CACHE_MAX_ENTRIES,
+    max_blob_size=config.BLOB_CACHE_MAX_BLOB_SIZE,
+)
@@ -0,0 +1,83 @@
+# infrastructure/change_notifier.py
+
+import asyncio
+import logging
+import os
+import threading
+from contextlib import asynccontextmanager
+from functools import partial
+from typing import Callable
+from redis import Redis
+from app.infrastructure.redis_client import RedisFallback, get_redis_client
+
+logger = logging.getLogger(__name__)
+
+CHANGES_CHANNEL = "file:changes"
+
+
+class ChangeNotifier:
+    """
+    Wakes long-polling change feed requests when one of their user's changes commits.
+
+    Commits are published on a Redis channel so a request parked on any
+    worker wakes up. Waiters on the publishing worker are also woken
+    directly, which is all that happens while Redis is unreachable; other
+    workers' waiters then just sleep out their timeout.
+    """
+
+    def __init__(self, redis: Callable[[], Redis]) -> None:
+        self.__redis = RedisFallback(redis, "Change notifier skipping Redis", channels={CHANGES_CHANNEL: self.__on_message})
+        self.__waiters: dict[str, set[tuple[asyncio.AbstractEventLoop, asyncio.Event]]] = {}
+        self.__lock = threading.Lock()  # the Redis listener runs on its own thread
+        self.__stats = {"published": 0, "wakeups": 0}
+        os.register_at_fork(after_in_child=self.__reset_after_fork)
+
+    def __reset_after_fork(self):
+        # the parent's waiters belong to its event loop
+        self.__waiters = {}
+        self.__lock = threading.Lock()
+
+    def __on_message(self, message):
+        self.__wake(message["data"].decode("utf-8"))
+
+    def __wake(self, user_id: str):
+        with self.__lock:
+            waiters = list(self.__waiters.get(user_id, ()))
+        for loop, event in waiters:
+            self.__stats["wakeups"] += 1
+            loop.call_soon_threadsafe(event.set)
+
+    @asynccontextmanager
+    async def listen(self, user_id: str):
+        """
+        Register interest in `user_id`'s changes and yield an asyncio.Event
+        that is set on the next one. Register before reading the feed so a
+        commit landing in between is not missed.
+        """
+        await self.__redis.ensure_listener()
+        waiter = (asyncio.get_running_loop(), asyncio.Event())
+        with self.__lock:
+            self.__waiters.setdefault(user_id, set()).add(waiter)
+        try:
+            yield waiter[1]
+        finally:
+            with self.__lock:
+                waiters = self.__waiters.get(user_id)
+                waiters.discard(waiter)
+                if not waiters:
+                    del self.__waiters[user_id]
+
+    async def publish(self, user_id: str):
+        self.__stats["published"] += 1
+        self.__wake(user_id)
+        await self.__redis.run_in_thread(lambda redis: redis.publish(CHANGES_CHANNEL, user_id))
+
+    def stats(self) -> dict:
+        with self.__lock:
+            waiting = sum(len(w) for w in self.__waiters.values())
+        return {"waiting_requests": waiting, "redis_listener": self.__redis.listening, **self.__stats, "redis_errors": self.__redis.errors}
+
+
+change_notifier = ChangeNotifier(
+    redis=partial(get_redis_client, fast=True),
+)
@@ -2,9 +2,9 @@
 
 from pathlib import Path
 import aiofiles
+import aiofiles.os
 
-BASE_UPLOAD_DIR = Path("uploads")
-BASE_UPLOAD_DIR.mkdir(exist_ok=True)
+BASE_UPLOAD_DIR = Path("uploads")    # created with the first stored blob
 
 async def save_file_locally(file_id: str, version_id: str, content: bytes, original_filename: str)->str:
     """
@@ -14,7 +14,7 @@ async def save_file_locally(file_id: str, version_id: str, content: bytes, origi
     Returns: absolute path as string
     """
     file_folder = BASE_UPLOAD_DIR / str(file_id)
-    file_folder.mkdir(exist_ok=True)
+    file_folder.mkdir(parents=True, exist_ok=True)
 
     extension = Path(original_filename).suffix
     version_filename = f"{version_id}{extension}"
@@ -37,3 +37,14 @@ async def fetch_local_file(file_path: str):
         return version_file_path
 
     return None
+
+async def read_local_file(file_path: str | Path) -> bytes:
+    async with aiofiles.open(file_path, "rb") as f:
+        return await f.read()
+
+async def delete_local_file(file_path: str):
+    """Remove a stored blob, e.g. one whose version was never committed. Missing files are ignored."""
+    try:
+        await aiofiles.os.remove(file_path)
+    except FileNotFoundError:
+        pass
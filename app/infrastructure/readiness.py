@@ -0,0 +1,109 @@
+# infrastructure/readiness.py
+
+import asyncio
+import importlib
+import logging
+import os
+import time
+from contextlib import AsyncExitStack
+from sqlalchemy.future import select
+from app.config import config
+from app.database import get_engine
+from app.infrastructure.file_storage import BASE_UPLOAD_DIR
+from app.infrastructure.redis_client import get_redis_client
+from app.models.File import File
+from app.models.User import get_pwd_context
+
+logger = logging.getLogger(__name__)
+
+
+async def _warm_database():
+    engine = get_engine()
+    async with AsyncExitStack() as stack:
+        connections = [await stack.enter_async_context(engine.connect()) for _ in range(max(1, config.DB_WARM_CONNECTIONS))]
+        # files.version_counter is added by the migrate step, so this also catches a skipped `python -m app.migrate`
+        await connections[0].execute(select(File.version_counter).limit(1))
+
+async def _warm_redis():
+    # the client on the upload and download paths
+    await asyncio.to_thread(get_redis_client(fast=True).ping)
+
+async def _warm_password_hashing():
+    # loads the bcrypt backend, which the first login would otherwise pay for
+    await asyncio.to_thread(lambda: get_pwd_context().handler("bcrypt").get_backend())
+
+async def _warm_task_queue():
+    await asyncio.to_thread(importlib.import_module, "app.background.celery_app")
+
+async def _warm_storage():
+    await asyncio.to_thread(BASE_UPLOAD_DIR.mkdir, exist_ok=True)
+
+
+class Readiness:
+    """
+    Warms up what the app builds lazily, after startup and in the background,
+    and reports it for GET /ready. Startup doesn't wait for it, so a process
+    binds its port at once and a load balancer sends traffic once /ready is
+    200. Failed checks are retried, every RETRY_SECONDS until the process is
+    ready and then backing off to MAX_RETRY_SECONDS, so a deployment without
+    Redis isn't retried and logged forever at full rate; each failure is
+    logged once. Redis is reported but not required: every Redis user except
+    OTP storage falls back to local state without it.
+    """
+
+    RETRY_SECONDS = 2
+    MAX_RETRY_SECONDS = 300
+    CHECKS = {
+        "database": (_warm_database, True),
+        "redis": (_warm_redis, False),
+        "password_hashing": (_warm_password_hashing, True),
+        "task_queue": (_warm_task_queue, True),
+        "storage": (_warm_storage, True),
+    }
+
+    def __init__(self) -> None:
+        self.__checks: dict[str, dict] = {}
+        self.__ready_after_ms = None
+
+    @property
+    def ready(self) -> bool:
+        return all(self.__checks.get(name, {}).get("ok") for name, (_, required) in self.CHECKS.items() if required)
+
+    async def __run(self, name: str) -> bool:
+        warm, _ = self.CHECKS[name]
+        started = time.perf_counter()
+        failing = self.__checks.get(name, {}).get("ok") is False
+        try:
+            await warm()
+        except Exception as exc:
+            # once per outage; the report keeps the latest error
+            logger.log(logging.DEBUG if failing else logging.WARNING, "Warm-up of %s failed, retrying: %s", name, exc)
+            self.__checks[name] = {"ok": False, "error": str(exc)}
+            return False
+        if failing:
+            logger.info("Warm-up of %s succeeded after failing", name)
+        self.__checks[name] = {"ok": True, "ms": round((time.perf_counter() - started) * 1000, 1)}
+        return True
+
+    async def warm_up(self):
+        started = time.perf_counter()
+        pending = list(self.CHECKS)
+        delay = self.RETRY_SECONDS
+        while pending:
+            results = await asyncio.gather(*(self.__run(name) for name in pending))
+            pending = [name for name, ok in zip(pending, results) if not ok]
+            if self.ready and self.__ready_after_ms is None:
+                self.__ready_after_ms = round((time.perf_counter() - started) * 1000, 1)
+                logger.info("Ready after %s ms", self.__ready_after_ms)
+            if pending:
+                await asyncio.sleep(delay)
+                if self.ready:
+                    # only optional checks are left failing
+                    delay = min(delay * 2, self.MAX_RETRY_SECONDS)
+
+    def report(self) -> dict:
+        # with several workers behind one port the pid tells which one answered
+        return {"ready": self.ready, "pid": os.getpid(), "ready_after_ms": self.__ready_after_ms, "checks": dict(self.__checks)}
+
+
+readiness = Readiness()
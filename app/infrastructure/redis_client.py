@@ -1,6 +1,117 @@
 # infrastructure/redis_client.py
 
+import asyncio
+import logging
+import os
+import time
+from typing import Callable, TypeVar
 from redis import Redis
+from redis.exceptions import RedisError
 from app.config import config
 
-redis_client = Redis.from_url(config.REDIS_URL)
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+_clients: dict[bool, Redis] = {}
+# a forked child builds its own clients instead of sharing the parent's sockets
+os.register_at_fork(after_in_child=_clients.clear)
+
+def get_redis_client(fast: bool = False) -> Redis:
+    """
+    The process' Redis client, built on first use rather than at import.
+    Components share one connection pool per kind of client: `fast` clients
+    give up after 0.5 s so the caches and upload admission can fall back to
+    local state quickly; OTP storage waits as long as it takes.
+    """
+    client = _clients.get(fast)
+    if client is None:
+        timeout = 0.5 if fast else None
+        client = _clients[fast] = Redis.from_url(config.REDIS_URL, socket_timeout=timeout, socket_connect_timeout=timeout)
+    return client
+
+
+class RedisFallback:
+    """
+    The Redis side of a component that keeps working on local state without
+    Redis: upload admission, the version cache and the change notifier.
+
+    `run()` calls Redis unless a recent failure put it in a cooldown of
+    COOLDOWN_SECONDS, so an outage doesn't add a timeout to every request;
+    a RedisError logs `warning`, starts the cooldown and returns the
+    default. Request paths use `run_in_thread()`: the client is blocking,
+    and a slow Redis must not stall the event loop. `channels` maps pub/sub
+    channels to handlers, run on a listener thread that ensure_listener()
+    restarts after it dies. A forked child starts over without a listener
+    or cooldown.
+    """
+
+    COOLDOWN_SECONDS = 5
+
+    def __init__(self, redis: Callable[[], Redis], warning: str, channels: dict[str, Callable] | None = None) -> None:
+        self.__redis = redis    # client factory, so nothing is built at import
+        self.__warning = warning
+        self.__channels = channels or {}
+        self.__down_until = 0.0
+        self.__listener = None
+        self.__starting = False
+        self.errors = 0
+        os.register_at_fork(after_in_child=self.__reset_after_fork)
+
+    def __reset_after_fork(self):
+        # the listener thread doesn't survive a fork
+        self.__down_until = 0.0
+        self.__listener = None
+        self.__starting = False
+
+    @property
+    def available(self) -> bool:
+        return time.monotonic() >= self.__down_until
+
+    @property
+    def listening(self) -> bool:
+        return self.__listener is not None
+
+    def failed(self, exc: Exception):
+        self.errors += 1
+        self.__down_until = time.monotonic() + self.COOLDOWN_SECONDS
+        logger.warning("%s: %s", self.__warning, exc)
+
+    def run(self, operation: Callable[[Redis], T], default: T | None = None) -> T | None:
+        """`operation(client)`, or `default` while Redis is in its cooldown or when the call fails."""
+        if not self.available:
+            return default
+        try:
+            return operation(self.__redis())
+        except RedisError as exc:
+            self.failed(exc)
+            return default
+
+    async def run_in_thread(self, operation: Callable[[Redis], T], default: T | None = None) -> T | None:
+        """run() on a worker thread; during the cooldown the default comes back without the thread hop."""
+        if not self.available:
+            return default
+        return await asyncio.to_thread(self.run, operation, default)
+
+    async def ensure_listener(self):
+        if self.__listener is not None or self.__starting or not self.available:
+            return
+        self.__starting = True
+        try:
+            await asyncio.to_thread(self.__start_listener)
+        finally:
+            self.__starting = False
+
+    def __start_listener(self):
+        try:
+            pubsub = self.__redis().pubsub(ignore_subscribe_messages=True)
+            pubsub.subscribe(**self.__channels)
+            self.__listener = pubsub.run_in_thread(sleep_time=1, daemon=True, exception_handler=self.__on_listener_error)
+        except RedisError as exc:
+            self.failed(exc)
+
+    def __on_listener_error(self, exc, pubsub, thread):
+        thread.stop()
+        pubsub.close()
+        self.__listener = None
+        self.failed(exc)
@@ -0,0 +1,151 @@
+# infrastructure/search_index.py
+
+import logging
+from dataclasses import asdict, dataclass
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class SearchDocument:
+    file_id: str
+    user_id: str
+    file_name: str
+    version_id: str
+    version_number: int
+    body: str
+
+
+def _quote(term: str) -> str:
+    return '"' + term.replace('"', '""') + '"'
+
+
+class SqliteSearchIndex:
+    """
+    FTS5 table over the current version of each file. `file_search_docs`
+    maps a file to its FTS rowid and remembers which version is indexed,
+    so replacing a document is a rowid delete + insert, never a scan.
+
+    Each document also carries its owner as a single token in the `owner`
+    column, and every query requires it: FTS5 intersects the owner's
+    posting list with the terms' inside the index, so a search only ranks
+    the user's own documents however large the whole index grows.
+    """
+
+    # prefix indexes: a short last term ("bu*") is one posting list instead of every matching term's merged
+    FTS_DDL = (
+        "CREATE VIRTUAL TABLE IF NOT EXISTS file_search USING fts5("
+        "owner, file_name, body, tokenize='unicode61 remove_diacritics 2', prefix='2 3 4')"
+    )
+    DDL = (
+        "CREATE TABLE IF NOT EXISTS file_search_docs ("
+        " id INTEGER PRIMARY KEY, file_id TEXT NOT NULL UNIQUE, user_id TEXT NOT NULL,"
+        " version_id TEXT NOT NULL, version_number INTEGER NOT NULL, file_name TEXT NOT NULL)",
+        "CREATE INDEX IF NOT EXISTS ix_file_search_docs_user_id ON file_search_docs (user_id)",
+        FTS_DDL,
+    )
+    @staticmethod
+    def owner_token(user_id: str) -> str:
+        # one unicode61 token for a uuid; anything else still matches as a phrase
+        return "u" + user_id.replace("-", "")
+
+    @classmethod
+    def match_expression(cls, user_id: str, query: str) -> str:
+        # every term quoted (no FTS syntax from users), all required, the last one as a prefix
+        terms = [_quote(term) for term in query.split()]
+        terms[-1] += "*"
+        return f"owner:{_quote(cls.owner_token(user_id))} AND {{file_name body}}:({' '.join(terms)})"
+
+    async def upsert(self, db: AsyncSession, doc: SearchDocument) -> bool:
+        """Index `doc` unless a newer version of the file is already indexed. Returns whether it was written."""
+        params = {
+            "file_id": doc.file_id, "user_id": doc.user_id, "file_name": doc.file_name,
+            "version_id": doc.version_id, "version_number": doc.version_number,
+        }
+        # statements write first, so the transaction holds SQLite's write lock from the start
+        rowid = (await db.execute(text(
+            "UPDATE file_search_docs SET version_id = :version_id, version_number = :version_number, file_name = :file_name"
+            " WHERE file_id = :file_id AND version_number < :version_number RETURNING id"
+        ), params)).scalar_one_or_none()
+        if rowid is not None:
+            await db.execute(text("DELETE FROM file_search WHERE rowid = :rowid"), {"rowid": rowid})
+        else:
+            rowid = (await db.execute(text(
+                "INSERT INTO file_search_docs (file_id, user_id, version_id, version_number, file_name)"
+                " VALUES (:file_id, :user_id, :version_id, :version_number, :file_name)"
+                " ON CONFLICT (file_id) DO NOTHING RETURNING id"
+            ), params)).scalar_one_or_none()
+            if rowid is None:
+                return False
+        await db.execute(
+            text("INSERT INTO file_search (rowid, owner, file_name, body) VALUES (:rowid, :owner, :file_name, :body)"),
+            {"rowid": rowid, "owner": self.owner_token(doc.user_id), "file_name": doc.file_name, "body": doc.body},
+        )
+        return True
+
+    async def search(self, db: AsyncSession, user_id: str, query: str, limit: int, offset: int):
+        result = await db.execute(text(
+            "SELECT d.file_id, d.file_name, d.version_id, d.version_number,"
+            " snippet(file_search, 2, '<b>', '</b>', '…', 16) AS snippet,"
+            " -bm25(file_search, 0.0, 4.0, 1.0) AS rank"
+            " FROM file_search JOIN file_search_docs d ON d.id = file_search.rowid"
+            " WHERE file_search MATCH :match AND d.user_id = :user_id"
+            " ORDER BY rank DESC LIMIT :limit OFFSET :offset"
+        ), {"match": self.match_expression(user_id, query), "user_id": user_id, "limit": limit, "offset": offset})
+        return result.mappings().all()
+
+
+class PostgresSearchIndex:
+    """tsvector column with a GIN index, file name weighted above content."""
+
+    DDL = (
+        "CREATE TABLE IF NOT EXISTS file_search_docs ("
+        " file_id TEXT PRIMARY KEY, user_id TEXT NOT NULL, version_id TEXT NOT NULL,"
+        " version_number INTEGER NOT NULL, file_name TEXT NOT NULL, body TEXT NOT NULL, document tsvector NOT NULL)",
+        "CREATE INDEX IF NOT EXISTS ix_file_search_docs_user_id ON file_search_docs (user_id)",
+        "CREATE INDEX IF NOT EXISTS ix_file_search_docs_document ON file_search_docs USING GIN (document)",
+    )
+
+    async def upsert(self, db: AsyncSession, doc: SearchDocument) -> bool:
+        result = await db.execute(text(
+            "INSERT INTO file_search_docs (file_id, user_id, version_id, version_number, file_name, body, document)"
+            " VALUES (:file_id, :user_id, :version_id, :version_number, :file_name, :body,"
+            "  setweight(to_tsvector('simple', :file_name), 'A') || setweight(to_tsvector('simple', :body), 'B'))"
+            " ON CONFLICT (file_id) DO UPDATE SET version_id = EXCLUDED.version_id, version_number = EXCLUDED.version_number,"
+            "  file_name = EXCLUDED.file_name, body = EXCLUDED.body, document = EXCLUDED.document"
+            " WHERE file_search_docs.version_number < EXCLUDED.version_number"
+        ), asdict(doc))
+        return result.rowcount > 0
+
+    async def search(self, db: AsyncSession, user_id: str, query: str, limit: int, offset: int):
+        result = await db.execute(text(
+            "SELECT file_id, file_name, version_id, version_number,"
+            " ts_headline('simple', body, q, 'StartSel=<b>, StopSel=</b>, MaxWords=24, MinWords=8') AS snippet,"
+            " ts_rank_cd(document, q) AS rank"
+            " FROM file_search_docs, websearch_to_tsquery('simple', :query) q"
+            " WHERE user_id = :user_id AND document @@ q"
+            " ORDER BY rank DESC LIMIT :limit OFFSET :offset"
+        ), {"query": query, "user_id": user_id, "limit": limit, "offset": offset})
+        return result.mappings().all()
+
+
+_INDEXES = {"sqlite": SqliteSearchIndex(), "postgresql": PostgresSearchIndex()}
+
+
+def get_search_index(dialect_name: str):
+    try:
+        return _INDEXES[dialect_name]
+    except KeyError:
+        raise RuntimeError(f"Full-text search is not supported on {dialect_name}")
+
+
+def create_search_index(connection):
+    """Create the index tables for the connection's database; used next to create_all."""
+    index = _INDEXES.get(connection.dialect.name)
+    if index is None:
+        logger.warning("No full-text search index for %s, /file/search is unavailable", connection.dialect.name)
+        return
+    for statement in index.DDL:
+        connection.execute(text(statement))
@@ -0,0 +1,274 @@
+# infrastructure/upload_admission.py
+
+import logging
+import os
+import time
+from dataclasses import dataclass
+from functools import partial
+from typing import Callable
+from uuid import uuid4
+from fastapi import HTTPException, status
+from fastapi.responses import JSONResponse
+from redis import Redis
+from app.authentication.tokenManager import decode_token
+from app.config import config
+from app.infrastructure.redis_client import RedisFallback, get_redis_client
+
+logger = logging.getLogger(__name__)
+
+GLOBAL_KEY = "upload:inflight:global"
+USER_KEY = "upload:inflight:user:{user_id}"
+# room for the multipart boundaries and part headers around the file itself
+MULTIPART_OVERHEAD = 64 * 1024
+
+# Leases live in a sorted set per scope: member "<lease id>:<bytes>", score
+# = expiry in ms. Expired leases (a worker died mid-upload) are dropped on
+# every acquire, so a crash can only hold capacity for UPLOAD_LEASE_SECONDS.
+# A scope with nothing in flight always admits one upload, however large.
+# Returns 0 on success, 1 when the user limit is hit, 2 for the global one.
+_ACQUIRE_SCRIPT = """
+local now, expiry, member, size = tonumber(ARGV[1]), tonumber(ARGV[2]), ARGV[3], tonumber(ARGV[4])
+local function over(key, max_count, max_bytes)
+    redis.call('ZREMRANGEBYSCORE', key, '-inf', now)
+    local members = redis.call('ZRANGE', key, 0, -1)
+    if #members == 0 then return false end
+    local bytes = 0
+    for _, m in ipairs(members) do bytes = bytes + tonumber(string.match(m, ':(%d+)$')) end
+    return #members + 1 > max_count or bytes + size > max_bytes
+end
+if over(KEYS[2], tonumber(ARGV[7]), tonumber(ARGV[8])) then return 1 end
+if over(KEYS[1], tonumber(ARGV[5]), tonumber(ARGV[6])) then return 2 end
+for _, key in ipairs(KEYS) do
+    redis.call('ZADD', key, expiry, member)
+    redis.call('PEXPIRE', key, tonumber(ARGV[9]))
+end
+return 0
+"""
+
+_USAGE_SCRIPT = """
+redis.call('ZREMRANGEBYSCORE', KEYS[1], '-inf', tonumber(ARGV[1]))
+local members = redis.call('ZRANGE', KEYS[1], 0, -1)
+local bytes = 0
+for _, m in ipairs(members) do bytes = bytes + tonumber(string.match(m, ':(%d+)$')) end
+return {#members, bytes}
+"""
+
+
+@dataclass(frozen=True)
+class AdmissionLimits:
+    max_concurrent: int
+    max_bytes: int
+    max_concurrent_per_user: int
+    max_bytes_per_user: int
+
+
+@dataclass
+class _Lease:
+    member: str
+    user_id: str
+    size: int
+    in_redis: bool
+
+
+class UploadAdmissionController:
+    """
+    Bounds concurrent uploads and bytes in flight, globally and per user.
+
+    Limits are shared by all workers through Redis. If Redis is unreachable
+    the same limits are enforced per process until it comes back; Redis is
+    retried after a short cooldown so an outage doesn't add a timeout to
+    every upload.
+    """
+
+    def __init__(self, redis: Callable[[], Redis], limits: AdmissionLimits, lease_seconds: int, retry_after: int) -> None:
+        self.__redis = RedisFallback(redis, "Upload admission falling back to local limits")
+        self.__scripts_client = None
+        self.limits = limits
+        self.lease_seconds = lease_seconds
+        self.retry_after = retry_after
+        # this worker's own uploads, also the limits source in fallback mode
+        self.__local_count = 0
+        self.__local_bytes = 0
+        self.__local_users: dict[str, tuple[int, int]] = {}
+        self.__stats = {"admitted": 0, "rejected_user_limit": 0, "rejected_global_limit": 0}
+        os.register_at_fork(after_in_child=self.__reset_after_fork)
+
+    def __reset_after_fork(self):
+        # a forked child has no uploads in flight
+        self.__local_count = 0
+        self.__local_bytes = 0
+        self.__local_users = {}
+
+    def __scripts(self, redis: Redis):
+        """The Lua scripts, registered on `redis`, the client of this process."""
+        if self.__scripts_client is not redis:
+            self.__acquire_script = redis.register_script(_ACQUIRE_SCRIPT)
+            self.__usage_script = redis.register_script(_USAGE_SCRIPT)
+            self.__scripts_client = redis
+        return self.__acquire_script, self.__usage_script
+
+    def __acquire_redis(self, lease: _Lease, redis: Redis) -> int:
+        now_ms = int(time.time() * 1000)
+        lease_ms = self.lease_seconds * 1000
+        acquire_script, _ = self.__scripts(redis)
+        return int(acquire_script(
+            keys=[GLOBAL_KEY, USER_KEY.format(user_id=lease.user_id)],
+            args=[
+                now_ms, now_ms + lease_ms, lease.member, lease.size,
+                self.limits.max_concurrent, self.limits.max_bytes,
+                self.limits.max_concurrent_per_user, self.limits.max_bytes_per_user,
+                lease_ms * 2,
+            ],
+        ))
+
+    def __acquire_local(self, lease: _Lease) -> int:
+        user_count, user_bytes = self.__local_users.get(lease.user_id, (0, 0))
+        if user_count and (user_count + 1 > self.limits.max_concurrent_per_user or user_bytes + lease.size > self.limits.max_bytes_per_user):
+            return 1
+        if self.__local_count and (self.__local_count + 1 > self.limits.max_concurrent or self.__local_bytes + lease.size > self.limits.max_bytes):
+            return 2
+        return 0
+
+    def __track(self, lease: _Lease, sign: int):
+        self.__local_count += sign
+        self.__local_bytes += sign * lease.size
+        user_count, user_bytes = self.__local_users.get(lease.user_id, (0, 0))
+        user_count, user_bytes = user_count + sign, user_bytes + sign * lease.size
+        if user_count:
+            self.__local_users[lease.user_id] = (user_count, user_bytes)
+        else:
+            self.__local_users.pop(lease.user_id, None)
+
+    def __reject(self, verdict: int):
+        if verdict == 1:
+            self.__stats["rejected_user_limit"] += 1
+            raise HTTPException(
+                status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="Too many uploads in progress for this user",
+                headers={"Retry-After": str(self.retry_after)},
+            )
+        self.__stats["rejected_global_limit"] += 1
+        raise HTTPException(
+            status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Upload capacity exhausted, try again later",
+            headers={"Retry-After": str(self.retry_after)},
+        )
+
+    async def acquire(self, user_id: str, size: int) -> _Lease:
+        """Reserve capacity for an upload of `size` bytes or raise 429 (user) / 503 (global)."""
+        lease = _Lease(f"{uuid4().hex}:{size}", user_id, size, in_redis=False)
+        verdict = await self.__redis.run_in_thread(partial(self.__acquire_redis, lease))
+        lease.in_redis = verdict is not None
+        if verdict is None:
+            verdict = self.__acquire_local(lease)
+        if verdict:
+            self.__reject(verdict)
+        self.__track(lease, +1)
+        self.__stats["admitted"] += 1
+        return lease
+
+    async def release(self, lease: _Lease):
+        self.__track(lease, -1)
+        if lease.in_redis:
+            # if this fails the lease expires on its own after lease_seconds
+            await self.__redis.run_in_thread(partial(self.__release_redis, lease))
+
+    @staticmethod
+    def __release_redis(lease: _Lease, redis: Redis):
+        pipe = redis.pipeline(transaction=False)
+        pipe.zrem(GLOBAL_KEY, lease.member)
+        pipe.zrem(USER_KEY.format(user_id=lease.user_id), lease.member)
+        pipe.execute()
+
+    def stats(self) -> dict:
+        cluster = self.__redis.run(self.__cluster_usage)
+        return {
+            "backend": "redis" if cluster is not None else "local",
+            "limits": {
+                "max_concurrent": self.limits.max_concurrent,
+                "max_bytes": self.limits.max_bytes,
+                "max_concurrent_per_user": self.limits.max_concurrent_per_user,
+                "max_bytes_per_user": self.limits.max_bytes_per_user,
+            },
+            "worker": {"in_flight_uploads": self.__local_count, "in_flight_bytes": self.__local_bytes},
+            "cluster": cluster,
+            **self.__stats,
+            "redis_errors": self.__redis.errors,
+        }
+
+    def __cluster_usage(self, redis: Redis) -> dict:
+        count, in_bytes = self.__scripts(redis)[1](keys=[GLOBAL_KEY], args=[int(time.time() * 1000)])
+        return {"in_flight_uploads": int(count), "in_flight_bytes": int(in_bytes)}
+
+
+class UploadAdmissionMiddleware:
+    """
+    ASGI middleware admitting `POST /file/` before its body is read.
+
+    FastAPI parses (and spools to disk) the whole multipart body before
+    the handler or its dependencies run, so admission there would let a
+    burst of large uploads in anyway. Here the size comes from
+    Content-Length and the user from the bearer token's `sub`; rejected
+    requests get 401/411/413/429/503 without their body being received.
+    The route still authenticates the user against the database.
+    """
+
+    def __init__(self, app, path: str = "/file/") -> None:
+        self.app = app
+        self.path = path
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] != "POST" or scope["path"] != self.path:
+            await self.app(scope, receive, send)
+            return
+        try:
+            user_id, size = self.__identify(scope)
+            lease = await upload_admission.acquire(user_id, size)
+        except HTTPException as exc:
+            await JSONResponse({"detail": exc.detail}, status_code=exc.status_code, headers=exc.headers)(scope, receive, send)
+            return
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            await upload_admission.release(lease)
+
+    @staticmethod
+    def __identify(scope) -> tuple[str, int]:
+        headers = dict(scope["headers"])
+        scheme, _, token = headers.get(b"authorization", b"").decode("latin-1").partition(" ")
+        user_id = None
+        if scheme.lower() == "bearer" and token:
+            try:
+                user_id = decode_token(token).get("sub")
+            except HTTPException:
+                pass
+        if not user_id:
+            raise HTTPException(
+                status.HTTP_401_UNAUTHORIZED,
+                detail="Could not validate credentials",
+                headers={"WWW-Authenticate": "Bearer"},
+            )
+        try:
+            size = int(headers[b"content-length"])
+        except (KeyError, ValueError):
+            raise HTTPException(status.HTTP_411_LENGTH_REQUIRED, detail="Content-Length is required for uploads")
+        if size > config.MAX_FILE_SIZE + MULTIPART_OVERHEAD:
+            raise HTTPException(
+                status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                detail=f"File size exceeds limit of {config.MAX_FILE_SIZE // (1024 * 1024)} MB",
+            )
+        return user_id, size
+
+
+upload_admission = UploadAdmissionController(
+    # short timeouts: a slow Redis must not stall uploads, we fall back instead
+    redis=partial(get_redis_client, fast=True),
+    limits=AdmissionLimits(
+        max_concurrent=config.UPLOAD_MAX_CONCURRENT,
+        max_bytes=config.UPLOAD_MAX_BYTES_IN_FLIGHT,
+        max_concurrent_per_user=config.UPLOAD_MAX_CONCURRENT_PER_USER,
+        max_bytes_per_user=config.UPLOAD_MAX_BYTES_IN_FLIGHT_PER_USER,
+    ),
+    lease_seconds=config.UPLOAD_LEASE_SECONDS,
+    retry_after=config.UPLOAD_RETRY_AFTER_SECONDS,
+)
@@ -0,0 +1,167 @@
+# infrastructure/version_cache.py
+
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from functools import partial
+from typing import Callable
+from redis import Redis
+from app.config import config
+from app.infrastructure.redis_client import RedisFallback, get_redis_client
+
+logger = logging.getLogger(__name__)
+
+INVALIDATION_CHANNEL = "vmeta:invalidate"
+CURRENT = "current"
+
+
+@dataclass(frozen=True)
+class CachedVersion:
+    id: str
+    file_id: str
+    version_number: int
+    check_sum: str
+    storage_path: str
+    created_at: datetime
+    # as of caching: only kept accurate for "current" entries, which uploads invalidate
+    is_current: bool
+
+    def to_json(self) -> str:
+        return json.dumps({**asdict(self), "created_at": self.created_at.isoformat()})
+
+    @classmethod
+    def from_json(cls, raw: bytes) -> "CachedVersion":
+        data = json.loads(raw)
+        data["created_at"] = datetime.fromisoformat(data["created_at"])
+        return cls(**data)
+
+
+def _key(user_id: str, file_name: str, version_id: str | None) -> str:
+    # the version part is length-prefixed so "<version>:<file name>" can't be split two ways
+    version = version_id or CURRENT
+    return f"vmeta:{user_id}:{len(version)}:{version}:{file_name}"
+
+
+class VersionMetadataCache:
+    """
+    Read-through cache of `(user, file_name, version_id) -> version metadata`.
+
+    Two tiers: a per-process LRU in front of Redis. A specific version never
+    changes, so those entries only expire to bound memory. "Current" entries
+    live for `current_ttl` seconds and are dropped on upload; the drop is
+    published on a Redis channel so other workers evict their LRU copy too.
+    Any Redis failure degrades to the local tier plus the database.
+    """
+
+    def __init__(self, redis: Callable[[], Redis], max_local_entries: int, version_ttl: int, current_ttl: int) -> None:
+        self.__redis = RedisFallback(redis, "Version cache skipping Redis", channels={INVALIDATION_CHANNEL: self.__on_invalidation})
+        self.max_local_entries = max_local_entries
+        self.version_ttl = version_ttl
+        self.current_ttl = current_ttl
+        self.__local: OrderedDict[str, tuple[float, CachedVersion]] = OrderedDict()
+        self.__lock = threading.Lock()  # the invalidation listener runs on its own thread
+        self.__stats = {"local_hits": 0, "redis_hits": 0, "misses": 0, "invalidations": 0}
+        os.register_at_fork(after_in_child=self.__reset_after_fork)
+
+    def __reset_after_fork(self):
+        # the parent's listener doesn't come along, so the copied entries would miss invalidations
+        self.__local = OrderedDict()
+        self.__lock = threading.Lock()
+
+    def __on_invalidation(self, message):
+        self.__drop_local(message["data"].decode("utf-8"))
+
+    def __drop_local(self, key: str):
+        with self.__lock:
+            self.__local.pop(key, None)
+
+    def __get_local(self, key: str) -> CachedVersion | None:
+        with self.__lock:
+            item = self.__local.get(key)
+            if item is None:
+                return None
+            expires_at, entry = item
+            if expires_at < time.monotonic():
+                del self.__local[key]
+                return None
+            self.__local.move_to_end(key)
+            return entry
+
+    def __put_local(self, key: str, entry: CachedVersion, ttl: int):
+        with self.__lock:
+            self.__local[key] = (time.monotonic() + ttl, entry)
+            self.__local.move_to_end(key)
+            while len(self.__local) > self.max_local_entries:
+                self.__local.popitem(last=False)
+
+    async def get(self, user_id: str, file_name: str, version_id: str | None) -> CachedVersion | None:
+        await self.__redis.ensure_listener()
+        key = _key(user_id, file_name, version_id)
+        entry = self.__get_local(key)
+        if entry is not None:
+            self.__stats["local_hits"] += 1
+            return entry
+        raw = await self.__redis.run_in_thread(lambda redis: redis.get(key))
+        if raw is not None:
+            entry = CachedVersion.from_json(raw)
+            self.__put_local(key, entry, self.current_ttl if version_id is None else self.version_ttl)
+            self.__stats["redis_hits"] += 1
+            return entry
+        self.__stats["misses"] += 1
+        return None
+
+    async def put(self, user_id: str, file_name: str, requested_version_id: str | None, version) -> CachedVersion:
+        """
+        Cache a resolved FileVersion. It is stored as immutable only when it
+        is the version that was asked for; the lookup falls back to the
+        current version otherwise, which is cached as such.
+        """
+        entry = CachedVersion(
+            id=version.id,
+            file_id=version.file_id,
+            version_number=version.version_number,
+            check_sum=version.check_sum,
+            storage_path=version.storage_path,
+            created_at=version.created_at,
+            is_current=version.is_current,
+        )
+        if requested_version_id is not None and version.id == requested_version_id:
+            key, ttl = _key(user_id, file_name, requested_version_id), self.version_ttl
+        elif requested_version_id is None:
+            key, ttl = _key(user_id, file_name, None), self.current_ttl
+        else:
+            return entry
+        self.__put_local(key, entry, ttl)
+        await self.__redis.run_in_thread(lambda redis: redis.set(key, entry.to_json(), ex=ttl))
+        return entry
+
+    async def invalidate_current(self, user_id: str, file_name: str):
+        """Forget the cached current version of a file, here and on every other worker."""
+        key = _key(user_id, file_name, None)
+        self.__drop_local(key)
+        self.__stats["invalidations"] += 1
+        await self.__redis.run_in_thread(lambda redis: redis.pipeline(transaction=False).delete(key).publish(INVALIDATION_CHANNEL, key).execute())
+
+    def stats(self) -> dict:
+        lookups = self.__stats["local_hits"] + self.__stats["redis_hits"] + self.__stats["misses"]
+        hits = lookups - self.__stats["misses"]
+        return {
+            "local_entries": len(self.__local),
+            "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+            "invalidation_listener": self.__redis.listening,
+            **self.__stats,
+            "redis_errors": self.__redis.errors,
+        }
+
+
+version_cache = VersionMetadataCache(
+    redis=partial(get_redis_client, fast=True),
+    max_local_entries=config.VERSION_CACHE_LOCAL_ENTRIES,
+    version_ttl=config.VERSION_CACHE_TTL_SECONDS,
+    current_ttl=config.VERSION_CACHE_CURRENT_TTL_SECONDS,
+)
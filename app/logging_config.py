@@ -0,0 +1,172 @@
+# logging_config.py
+
+"""
+Process-wide logging setup.
+
+Records are handed to a `QueueListener` thread, which does the JSON
+encoding and the actual write, so the event loop never blocks on log I/O.
+Every HTTP request gets a request ID (taken from `X-Request-ID` or
+generated) that is stamped on its records, and a sampling decision: for
+unsampled requests records below WARNING are dropped before they are
+formatted. Warnings and errors are always kept. uvicorn's loggers,
+including its access log, go through the same queue.
+"""
+
+import copy
+import json
+import logging
+import os
+import queue
+import random
+import re
+import sys
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from uuid import uuid4
+from app.config import config
+
+request_id_var: ContextVar[str | None] = ContextVar("request_id", default=None)
+_verbose_sampled: ContextVar[bool] = ContextVar("verbose_sampled", default=True)
+
+_REQUEST_ID_PATTERN = re.compile(r"^[A-Za-z0-9._-]{1,128}$")
+
+_listener: QueueListener | None = None
+
+UVICORN_LOGGERS = ("uvicorn", "uvicorn.error", "uvicorn.access")
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        payload = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        request_id = getattr(record, "request_id", None)
+        if request_id:
+            payload["request_id"] = request_id
+        if record.exc_text:
+            payload["exc_info"] = record.exc_text
+        return json.dumps(payload, default=str)
+
+
+class RequestContextFilter(logging.Filter):
+    """Drop verbose records of unsampled requests and tag the rest with the request ID."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno < logging.WARNING and not _verbose_sampled.get():
+            return False
+        record.request_id = request_id_var.get()
+        return True
+
+
+class _DeferredQueueHandler(QueueHandler):
+    """
+    QueueHandler that only merges the message args in the caller.
+
+    The stock `prepare()` runs the full formatter on the emitting thread;
+    here the args are resolved while the objects they reference are still
+    valid and everything else happens on the listener thread.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+def setup_logging() -> None:
+    """Route the root logger through a background QueueListener. Safe to call twice."""
+    global _listener
+    if _listener is not None:
+        return
+
+    stream_handler = logging.StreamHandler(sys.stdout)
+    if config.LOG_FORMAT == "json":
+        stream_handler.setFormatter(JsonFormatter())
+    else:
+        stream_handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s [%(request_id)s] %(name)s: %(message)s"))
+
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    queue_handler = _DeferredQueueHandler(log_queue)
+    queue_handler.addFilter(RequestContextFilter())
+
+    # DEBUG is only honoured for our own loggers; library debug output
+    # (e.g. aiosqlite's per-statement records) would swamp the queue.
+    level = logging.getLevelNamesMapping()[config.LOG_LEVEL.upper()]
+    root = logging.getLogger()
+    root.handlers = [queue_handler]
+    root.setLevel(max(level, logging.INFO))
+    logging.getLogger("app").setLevel(level)
+    logging.getLogger("sqlalchemy.engine").setLevel(logging.INFO if config.SQL_ECHO else logging.WARNING)
+    # uvicorn installs its own handlers writing straight to stderr; its access
+    # log is emitted inside the request, so through the queue it gets the
+    # request ID and sampling like every other record
+    for name in UVICORN_LOGGERS:
+        uvicorn_logger = logging.getLogger(name)
+        uvicorn_logger.handlers = []
+        uvicorn_logger.propagate = True
+
+    _listener = QueueListener(log_queue, stream_handler, respect_handler_level=True)
+    _listener.start()
+
+
+def _restart_logging_after_fork() -> None:
+    # the listener thread doesn't survive a fork; without a new one the child's records would pile up in the queue
+    global _listener
+    if _listener is not None:
+        _listener = None
+        setup_logging()
+
+
+os.register_at_fork(after_in_child=_restart_logging_after_fork)
+
+
+def shutdown_logging() -> None:
+    """Flush queued records and stop the listener thread."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+class RequestContextMiddleware:
+    """ASGI middleware assigning a request ID and a log sampling decision to each HTTP request."""
+
+    def __init__(self, app) -> None:
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_id = None
+        for name, value in scope["headers"]:
+            if name == b"x-request-id":
+                candidate = value.decode("latin-1")
+                if _REQUEST_ID_PATTERN.match(candidate):
+                    request_id = candidate
+                break
+        if request_id is None:
+            request_id = uuid4().hex
+        header = (b"x-request-id", request_id.encode("ascii"))
+
+        async def send_with_request_id(message):
+            if message["type"] == "http.response.start":
+                message["headers"] = [*message.get("headers", []), header]
+            await send(message)
+
+        id_token = request_id_var.set(request_id)
+        sampled_token = _verbose_sampled.set(random.random() < config.LOG_SAMPLE_RATE)
+        try:
+            await self.app(scope, receive, send_with_request_id)
+        finally:
+            _verbose_sampled.reset(sampled_token)
+            request_id_var.reset(id_token)
@@ -1,48 +1,72 @@
 # main.py
 
+import asyncio
+import os
 from fastapi import FastAPI
-import uvicorn
-from app.database import engine, Base
+from fastapi.responses import JSONResponse
+from app.config import config
+from app.database import dispose_engine
 from contextlib import asynccontextmanager
+from app.infrastructure.readiness import readiness
+from app.infrastructure.upload_admission import UploadAdmissionMiddleware
 from app.routes.authRoutes import authRoute
+from app.routes.blobRoutes import blob_router
 from app.routes.fileRoutes import file_router
+from app.routes.metricsRoutes import metrics_router
+from app.logging_config import RequestContextMiddleware, setup_logging, shutdown_logging
 import logging
 
 logger = logging.getLogger(__name__)
 
-async def init_db():
-    try:
-        async with engine.begin() as conn:
-            await conn.run_sync(Base.metadata.create_all)
-        print("Database created successfully")
-    except Exception as e:
-        logger.error(f"Error initializing DB: {str(e)}")
-        raise
-
 async def close_db():
     try:
-        await engine.dispose()
-        print("Database disposed successfully")
+        await dispose_engine()
     except Exception as e:
-        logger.error(f"Error closing DB: {str(e)}")
+        logger.error("Error closing DB: %s", e)
         raise
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    await init_db()
+    # the schema is managed by `python -m app.migrate`; clients are built on first use and warmed up in the background
+    setup_logging()
+    warm_up = asyncio.create_task(readiness.warm_up())
     yield
+    warm_up.cancel()
     await close_db()
+    shutdown_logging()
 
 app = FastAPI(lifespan=lifespan)
+# the last one added runs first: request IDs are assigned before uploads are admitted
+app.add_middleware(UploadAdmissionMiddleware)
+app.add_middleware(RequestContextMiddleware)
 app.include_router(authRoute)
 app.include_router(file_router)
+app.include_router(blob_router)
+app.include_router(metrics_router)
 
 @app.get("/")
 def root():
     return {"message": "backend is online"}
 
+@app.get("/ready")
+def ready():
+    """200 once the database pool, password hashing and task queue are warm, 503 until then."""
+    report = readiness.report()
+    return JSONResponse(report, status_code=200 if report["ready"] else 503)
+
 def main():
-    uvicorn.run("app.main:app", host="localhost", port=8000, reload=True)
+    """
+    `python -m app.main`: WEB_WORKERS API processes behind one port, or a
+    single auto-reloading one with WEB_RELOAD. Each worker is its own
+    process and builds its own database engine, Redis clients, caches and
+    OTP service on first use; nothing is opened before the workers start.
+    """
+    import uvicorn
+    if config.WEB_RELOAD:
+        uvicorn.run("app.main:app", host=config.WEB_HOST, port=config.WEB_PORT, reload=True)
+        return
+    workers = config.WEB_WORKERS or os.cpu_count() or 1
+    uvicorn.run("app.main:app", host=config.WEB_HOST, port=config.WEB_PORT, workers=workers)
 
 if __name__ == "__main__":
     main()
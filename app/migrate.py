@@ -0,0 +1,81 @@
+# migrate.py
+
+"""
+Create and upgrade the database schema.
+
+    python -m app.migrate
+
+Run it once per deploy, before the API starts. Startup no longer touches the
+schema, so API and worker processes boot without DDL or inspection queries.
+"""
+
+import asyncio
+import logging
+from sqlalchemy import inspect, text
+from app.database import Base, dispose_engine, get_engine
+from app.infrastructure.search_index import create_search_index
+from app.logging_config import setup_logging, shutdown_logging
+# create_all only knows the tables of imported models
+from app.models import File, FileChange, FileVersion, IntegrityIssue, ScrubCheckpoint, User  # noqa: F401
+
+logger = logging.getLogger(__name__)
+
+# (table, index name, columns) that databases created before they were declared on the models lack
+_UNIQUE_KEYS = (
+    ("files", "uq_files_user_id_file_name", ("user_id", "file_name")),
+    ("file_versions", "uq_file_versions_file_id_version_number", ("file_id", "version_number")),
+    ("file_versions", "uq_file_versions_file_id_check_sum", ("file_id", "check_sum")),
+)
+
+def upgrade_schema(connection):
+    """
+    Bring tables created by an older release up to the models.
+    create_all only creates missing tables, it never alters existing ones.
+    """
+    inspector = inspect(connection)
+
+    if "version_counter" not in {c["name"] for c in inspector.get_columns("files")}:
+        logger.info("Adding files.version_counter")
+        connection.execute(text("ALTER TABLE files ADD COLUMN version_counter INTEGER NOT NULL DEFAULT 0"))
+        connection.execute(text(
+            "UPDATE files SET version_counter = "
+            "(SELECT COALESCE(MAX(version_number), 0) FROM file_versions WHERE file_versions.file_id = files.id)"
+        ))
+
+    for table, name, columns in _UNIQUE_KEYS:
+        existing = {tuple(c["column_names"]) for c in inspector.get_unique_constraints(table)}
+        existing |= {tuple(i["column_names"]) for i in inspector.get_indexes(table) if i["unique"]}
+        if columns in existing:
+            continue
+        column_list = ", ".join(columns)
+        duplicate = connection.execute(text(
+            f"SELECT 1 FROM {table} GROUP BY {column_list} HAVING COUNT(*) > 1 LIMIT 1"
+        )).first()
+        if duplicate:
+            logger.error("Not adding unique (%s) on %s: existing rows violate it, deduplicate them and migrate again", column_list, table)
+            continue
+        logger.info("Adding unique (%s) on %s", column_list, table)
+        connection.execute(text(f"CREATE UNIQUE INDEX {name} ON {table} ({column_list})"))
+
+async def migrate():
+    try:
+        async with get_engine().begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+            await conn.run_sync(upgrade_schema)
+            await conn.run_sync(create_search_index)
+        logger.info("Database schema is up to date")
+    except Exception as e:
+        logger.error("Error migrating DB: %s", e)
+        raise
+    finally:
+        await dispose_engine()
+
+def main():
+    setup_logging()
+    try:
+        asyncio.run(migrate())
+    finally:
+        shutdown_logging()
+
+if __name__ == "__main__":
+    main()
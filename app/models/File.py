@@ -2,17 +2,20 @@
 
 from typing import List
 from uuid import uuid4
-from sqlalchemy import Column, String, ForeignKey, DateTime
+from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, UniqueConstraint
 from datetime import datetime, timezone
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from app.database import Base
 
 class File(Base):
     __tablename__ = "files"
+    __table_args__ = (UniqueConstraint("user_id", "file_name", name="uq_files_user_id_file_name"),)
 
     id: Mapped[str] = mapped_column(String, primary_key=True, index=True, default=lambda: str(uuid4()), unique=True, nullable=False,)
     file_name: Mapped[str] = mapped_column(String, index=True, nullable=False)
     user_id: Mapped[str] = mapped_column(String, ForeignKey("users.id", ondelete="CASCADE"))
+    # last version number handed out; bumped with UPDATE ... RETURNING, see File_service.commit_new_version
+    version_counter: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0")
     created_at = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc))
 
     owner = relationship("User", back_populates="files")
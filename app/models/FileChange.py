@@ -0,0 +1,29 @@
+# models/FileChange.py
+
+from typing import Optional
+from sqlalchemy import Column, DateTime, ForeignKey, Index, Integer, String
+from datetime import datetime, timezone
+from sqlalchemy.orm import Mapped, mapped_column
+from app.database import Base
+
+FILE_CREATED = "file_created"
+FILE_DELETED = "file_deleted"
+VERSION_CREATED = "version_created"
+
+class FileChange(Base):
+    """
+    One entry of a user's change feed. `seq` only ever grows; sync clients
+    keep the last one they saw as their cursor. Rows outlive the file they
+    describe, so file_id is deliberately not a foreign key.
+    """
+    __tablename__ = "file_changes"
+    __table_args__ = (Index("ix_file_changes_user_seq", "user_id", "seq"),)
+
+    seq: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    user_id: Mapped[str] = mapped_column(String, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    kind: Mapped[str] = mapped_column(String, nullable=False)
+    file_id: Mapped[str] = mapped_column(String, nullable=False)
+    file_name: Mapped[str] = mapped_column(String, nullable=False)
+    version_id: Mapped[Optional[str]] = mapped_column(String, nullable=True)
+    version_number: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
+    created_at = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc))
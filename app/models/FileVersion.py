@@ -1,7 +1,7 @@
 # models/FileVersion.py
 
 from uuid import uuid4
-from sqlalchemy import Boolean, Column, String, ForeignKey, DateTime, Integer
+from sqlalchemy import Boolean, Column, String, ForeignKey, DateTime, Integer, UniqueConstraint
 from datetime import datetime, timezone
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from app.utils.hash_util import hash_bytes
@@ -9,6 +9,11 @@ from app.database import Base
 
 class FileVersion(Base):
     __tablename__ = "file_versions"
+    __table_args__ = (
+        UniqueConstraint("file_id", "version_number", name="uq_file_versions_file_id_version_number"),
+        # the same content is never stored twice for one file
+        UniqueConstraint("file_id", "check_sum", name="uq_file_versions_file_id_check_sum"),
+    )
 
     id: Mapped[str] = mapped_column(String, primary_key=True, index=True, default=lambda: str(uuid4()), unique=True, nullable=False,)
     file_id: Mapped[str] = mapped_column(String, ForeignKey("files.id", ondelete="CASCADE"))
@@ -0,0 +1,29 @@
+# models/IntegrityIssue.py
+
+from typing import Optional
+from sqlalchemy import Column, DateTime, ForeignKey, String
+from datetime import datetime, timezone
+from sqlalchemy.orm import Mapped, mapped_column
+from app.database import Base
+
+BLOB_MISSING = "missing"
+BLOB_MISMATCH = "mismatch"
+BLOB_UNREADABLE = "unreadable"
+
+class IntegrityIssue(Base):
+    """
+    A stored version whose blob failed the integrity scrub: missing from
+    storage, unreadable (a directory in its place, wrong permissions, an I/O
+    error), or content that no longer hashes to its check_sum. One row per
+    version; resolved_at is set when a later pass finds the blob intact.
+    """
+    __tablename__ = "integrity_issues"
+
+    version_id: Mapped[str] = mapped_column(String, ForeignKey("file_versions.id", ondelete="CASCADE"), primary_key=True)
+    kind: Mapped[str] = mapped_column(String, nullable=False)
+    storage_path: Mapped[str] = mapped_column(String, nullable=False)
+    expected_check_sum: Mapped[str] = mapped_column(String, nullable=False)
+    actual_check_sum: Mapped[Optional[str]] = mapped_column(String, nullable=True)
+    detected_at = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc))
+    last_checked_at = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc))
+    resolved_at = Column(DateTime(timezone=True), nullable=True)
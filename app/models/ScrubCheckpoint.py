@@ -0,0 +1,24 @@
+# models/ScrubCheckpoint.py
+
+from typing import Optional
+from sqlalchemy import BigInteger, Column, DateTime, Integer, String
+from datetime import datetime, timezone
+from sqlalchemy.orm import Mapped, mapped_column
+from app.database import Base
+
+class ScrubCheckpoint(Base):
+    """
+    Progress of the integrity scrub, so it resumes where it stopped. Versions
+    are walked in id order; `cursor` is the last id checked in the current
+    pass, None at the start of one.
+    """
+    __tablename__ = "scrub_checkpoints"
+
+    name: Mapped[str] = mapped_column(String, primary_key=True)
+    cursor: Mapped[Optional[str]] = mapped_column(String, nullable=True)
+    pass_started_at = Column(DateTime(timezone=True), nullable=True)
+    last_pass_completed_at = Column(DateTime(timezone=True), nullable=True)
+    passes_completed: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    blobs_checked: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    bytes_checked: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
+    updated_at = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc))
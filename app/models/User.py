@@ -4,12 +4,19 @@ from datetime import datetime, timezone
 from typing import List
 from sqlalchemy import Column, DateTime, String, Boolean
 from uuid import uuid4
-from passlib.context import CryptContext
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from app.database import Base
 from app.models.File import File
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated = "auto")
+_pwd_context = None
+
+def get_pwd_context():
+    """Password hashing context, built (and passlib imported) on first use."""
+    global _pwd_context
+    if _pwd_context is None:
+        from passlib.context import CryptContext
+        _pwd_context = CryptContext(schemes=["bcrypt"], deprecated = "auto")
+    return _pwd_context
 
 class User(Base):
     __tablename__ = "users"
@@ -24,7 +31,7 @@ class User(Base):
     files: Mapped[List["File"]] = relationship("File", back_populates="owner", cascade="all, delete-orphan")
 
     def verify_password(self, plain_password:str)->bool:
-        return pwd_context.verify(plain_password, self.password)
+        return get_pwd_context().verify(plain_password, self.password)
 
     def to_jwt_payload(self) -> dict:
         return {
@@ -34,4 +41,4 @@ class User(Base):
 
     @staticmethod
     def hash_password(password:str)->str:
-        return pwd_context.hash(password)
+        return get_pwd_context().hash(password)
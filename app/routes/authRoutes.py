@@ -1,12 +1,13 @@
 # routes/authRoutes.py
 
+import asyncio
 from fastapi import APIRouter, HTTPException, Request, status, Depends
 from typing import Annotated
 from pydantic import ValidationError
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.authentication.services import create_new_user, get_user_by_username_or_email, verify_the_account
 from app.authentication.tokenManager import create_access_token, create_refresh_token
-from app.background.celery_app import send_otp_email
+from app.background.dispatch import enqueue
 from app.schemas.Otp import OtpLoginResponse, OtpRequest, OtpResponse
 from app.schemas.Token import TokenResponse
 from app.schemas.User import UserCreate, UserCreateResponse, UserLogin
@@ -31,7 +32,7 @@ async def login(db: Annotated[AsyncSession, Depends(get_db)], request: Request):
                     password=form.get("password")
                 )
             except ValidationError as e:
-                logger.error(f"Error login route Validation of Request Body: {str(e)}")
+                logger.error("Error login route Validation of Request Body: %s", e)
                 raise HTTPException(status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(e))
         existing_user = await get_user_by_username_or_email(db, user_data.username, user_data.username)
         if existing_user is None:
@@ -44,16 +45,16 @@ async def login(db: Annotated[AsyncSession, Depends(get_db)], request: Request):
                 await db.commit()
                 raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Account was not verified")
             except Exception as e:
-                logger.error(f"Error deleting unverified account, login route: {str(e)}")
+                logger.error("Error deleting unverified account, login route: %s", e)
                 raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Unkown behaviour from the server in login route")
-        if not existing_user.verify_password(user_data.password):
+        if not await asyncio.to_thread(existing_user.verify_password, user_data.password):
             logger.error("Invalid Password")
             raise HTTPException(status.HTTP_403_FORBIDDEN, detail="Invalid UserName or Password")
-        task = send_otp_email.delay(existing_user.email)
+        task = enqueue("otp.send_email", existing_user.email)
 
         return OtpLoginResponse(taskID=task.id, message="Otp sent")
     except Exception as e:
-        logger.error(f"Error login route: {str(e)}")
+        logger.error("Error login route: %s", e)
         raise HTTPException(status.HTTP_400_BAD_REQUEST, detail="Error in Login route")
 
 @authRoute.post("/verify", response_model=TokenResponse)
@@ -82,7 +83,7 @@ async def register_new_user(db: Annotated[AsyncSession, Depends(get_db)], payloa
     try:
         return await create_new_user(db, payload)
     except Exception as e:
-        logger.error(f"Error register route: {str(e)}")
+        logger.error("Error register route: %s", e)
         raise
 
 @authRoute.post("/register-verify", response_model=OtpResponse)
@@ -94,5 +95,5 @@ async def verify_account_after_registration(
     try:
         return await verify_the_account(db, otp_service, payload)
     except Exception as e:
-        logger.error(f"Error verifying after register route: {str(e)}")
+        logger.error("Error verifying after register route: %s", e)
         raise
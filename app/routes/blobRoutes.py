@@ -0,0 +1,52 @@
+# routes/blobRoutes.py
+
+# Serves downloads from signed URLs. Deliberately has no database, user or
+# service imports: the signature is the only check, so this router can run
+# on its own in app.blob_app.
+
+import mimetypes
+from typing import Annotated
+from fastapi import APIRouter, Header, HTTPException, Response, status
+from fastapi.responses import FileResponse
+from app.authentication.urlSigner import verify_blob_token
+from app.infrastructure.blob_cache import blob_cache
+from app.infrastructure.file_storage import BASE_UPLOAD_DIR, fetch_local_file, read_local_file
+import logging
+
+logger = logging.getLogger(__name__)
+
+blob_router = APIRouter(
+    prefix="/blob",
+    tags=["blob"],
+)
+
+@blob_router.get("/{token}")
+async def download_signed_blob(
+    token: str,
+    range: Annotated[str | None, Header()] = None,
+    if_none_match: Annotated[str | None, Header()] = None,
+):
+    blob = verify_blob_token(token)
+    etag = f'"{blob.check_sum}"'
+    headers = {"ETag": etag}
+    if if_none_match == etag:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    # range requests are left to FileResponse, which knows how to serve them
+    if range is None:
+        cached = blob_cache.get(blob.check_sum)
+        if cached is not None:
+            return Response(cached, media_type=mimetypes.guess_type(blob.path)[0] or "text/plain", headers=headers)
+
+    base = BASE_UPLOAD_DIR.resolve()
+    file_path = await fetch_local_file(str(base / blob.path))
+    if file_path is None or not file_path.resolve().is_relative_to(base):
+        logger.error("Signed blob %s is missing from storage", blob.path)
+        raise HTTPException(status.HTTP_404_NOT_FOUND, detail="File not found")
+
+    if range is None and blob_cache.admits(blob.check_sum, file_path.stat().st_size):
+        content = await read_local_file(file_path)
+        blob_cache.put(blob.check_sum, content)
+        return Response(content, media_type=mimetypes.guess_type(blob.path)[0] or "text/plain", headers=headers)
+
+    return FileResponse(file_path, headers=headers)
@@ -1,14 +1,19 @@
 # routes/fileRoutes.py
 
+from datetime import datetime, timezone
 from typing import Annotated
-from fastapi import APIRouter, Depends, File, HTTPException, status, UploadFile
+import mimetypes
+from fastapi import APIRouter, Depends, File, HTTPException, Query, Request, Response, status, UploadFile
 from fastapi.responses import FileResponse
 from sqlalchemy.ext.asyncio import AsyncSession
+from app.config import config
 from app.database import get_db
 from app.dependencies.User import get_current_user
 from app.models.User import User
-from app.schemas.FileSchemas import AllFileResponse, FileVersionSchema
-from app.service.File_service import fetch_file_or_version, get_all_files_of_the_user, get_all_versions_of_file, get_local_file_path, save_file_service
+from app.schemas.FileSchemas import AllFileResponse, ChangeFeedResponse, FileVersionSchema, SearchResponse, SignedUrlResponse
+from app.service.Change_service import get_changes_since
+from app.service.Search_service import search_files
+from app.service.File_service import create_signed_download, get_all_files_of_the_user, get_all_versions_of_file, get_version_content, resolve_version, save_file_service
 import logging
 
 logger = logging.getLogger(__name__)
@@ -28,16 +33,53 @@ async def get_all_files_of_user(user: Annotated[User, Depends(get_current_user)]
 
         return AllFileResponse(files=result)
     except Exception as e:
-        logger.error(f"Error: {str(e)}")
+        logger.error("Error: %s", e)
         raise
 
+# /changes and /search are declared before /{file_name} so they aren't taken for file names
+@file_router.get("/changes", response_model=ChangeFeedResponse)
+async def get_changes(
+    user: Annotated[User, Depends(get_current_user)],
+    db: Annotated[AsyncSession, Depends(get_db)],
+    since: Annotated[int, Query(ge=0)] = 0,
+    limit: Annotated[int, Query(ge=1, le=config.CHANGES_MAX_PAGE_SIZE)] = config.CHANGES_PAGE_SIZE,
+    wait: Annotated[float, Query(ge=0)] = 0,
+):
+    """
+    Changes to the user's files after cursor `since`, oldest first.
+    Pass the returned `cursor` back as `since`; `wait` long-polls for up to that many seconds when nothing is new.
+    """
+    try:
+        return await get_changes_since(db, user.id, since, limit, wait)
+    except Exception as e:
+        logger.error("Error: %s", e)
+        raise HTTPException(status.HTTP_500_INTERNAL_SERVER_ERROR, detail="error occurred")
+
+@file_router.get("/search", response_model=SearchResponse)
+async def search_user_files(
+    user: Annotated[User, Depends(get_current_user)],
+    db: Annotated[AsyncSession, Depends(get_db)],
+    q: Annotated[str, Query(min_length=1, max_length=256, pattern=r"\S")],
+    limit: Annotated[int, Query(ge=1, le=config.SEARCH_MAX_PAGE_SIZE)] = config.SEARCH_PAGE_SIZE,
+    offset: Annotated[int, Query(ge=0)] = 0,
+):
+    """
+    Full-text search over the names and contents of the current version of the user's files, best match first.
+    Served from the search index, which a background task updates after each upload.
+    """
+    try:
+        return await search_files(db, user.id, q.strip(), limit, offset)
+    except Exception as e:
+        logger.error("Error: %s", e)
+        raise HTTPException(status.HTTP_500_INTERNAL_SERVER_ERROR, detail="error occurred")
+
 @file_router.get("/{file_name}", response_model=list[FileVersionSchema])
 async def get_file_by_name(user: Annotated[User, Depends(get_current_user)], db: Annotated[AsyncSession, Depends(get_db)], file_name: str, all: bool=False):
     try:
         if all:
             result = await get_all_versions_of_file(db, user.id, file_name)
         else:
-            single = await fetch_file_or_version(db, user.id, file_name)
+            single = await resolve_version(db, user.id, file_name)
             result = [single] if single else None
 
         if result is None:
@@ -45,27 +87,52 @@ async def get_file_by_name(user: Annotated[User, Depends(get_current_user)], db:
 
         return result
     except Exception as e:
-        logger.error(f"Error: {str(e)}")
+        logger.error("Error: %s", e)
         raise HTTPException(status.HTTP_500_INTERNAL_SERVER_ERROR, detail="error occurred")
 
 @file_router.get("/{file_name}/{version_id}")
-async def get_file_by_version(user: Annotated[User, Depends(get_current_user)], db: Annotated[AsyncSession, Depends(get_db)], file_name: str, version_id: str):
+async def get_file_by_version(request: Request, user: Annotated[User, Depends(get_current_user)], db: Annotated[AsyncSession, Depends(get_db)], file_name: str, version_id: str):
     try:
-        result = await get_local_file_path(db, user.id, file_name, version_id)
+        # range requests are left to FileResponse, which knows how to serve them
+        version, result = await get_version_content(db, user.id, file_name, version_id, use_blob_cache="range" not in request.headers)
 
         if result is None:
             raise HTTPException(status.HTTP_503_SERVICE_UNAVAILABLE, detail="error in the storage")
 
-        return FileResponse(result)
+        headers = {"ETag": f'"{version.check_sum}"'}
+        if isinstance(result, bytes):
+            media_type = mimetypes.guess_type(version.storage_path)[0] or "text/plain"
+            return Response(result, media_type=media_type, headers=headers)
+
+        return FileResponse(result, headers=headers)
+    except Exception as e:
+        logger.error("Error: %s", e)
+        raise HTTPException(status.HTTP_500_INTERNAL_SERVER_ERROR, detail="error occurred")
+
+@file_router.get("/{file_name}/{version_id}/signed-url", response_model=SignedUrlResponse)
+async def get_signed_download_url(request: Request, user: Annotated[User, Depends(get_current_user)], db: Annotated[AsyncSession, Depends(get_db)], file_name: str, version_id: str):
+    """Short-lived URL that downloads this version without auth or database lookups, see routes/blobRoutes.py."""
+    try:
+        result = await create_signed_download(db, user.id, file_name, version_id)
+
+        if result is None:
+            raise HTTPException(status.HTTP_404_NOT_FOUND, detail="Version not found")
+
+        token, expires_at = result
+        base_url = config.BLOB_BASE_URL.rstrip("/") or str(request.base_url).rstrip("/")
+        return SignedUrlResponse(url=f"{base_url}/blob/{token}", expires_at=datetime.fromtimestamp(expires_at, timezone.utc))
+    except HTTPException:
+        raise
     except Exception as e:
-        logger.error(f"Error: {str(e)}")
+        logger.error("Error: %s", e)
         raise HTTPException(status.HTTP_500_INTERNAL_SERVER_ERROR, detail="error occurred")
 
 @file_router.post("/", status_code=status.HTTP_201_CREATED)
 async def create_new_file_version(file: Annotated[UploadFile, File(...)], user: Annotated[User, Depends(get_current_user)], db: Annotated[AsyncSession, Depends(get_db)]):
     try:
+        # admitted by UploadAdmissionMiddleware before the body was read
         result = await save_file_service(db, user.id, file)
         return {"message": "Successfully file saved", "version_id": result}
     except Exception as e:
-        logger.error(f"Error: {str(e)}")
+        logger.error("Error: %s", e)
         raise
@@ -0,0 +1,44 @@
+# routes/metricsRoutes.py
+
+from typing import Annotated
+from fastapi import APIRouter, Depends
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.database import get_db
+from app.dependencies.Metrics import require_metrics_token
+from app.infrastructure.blob_cache import blob_cache
+from app.infrastructure.change_notifier import change_notifier
+from app.infrastructure.upload_admission import upload_admission
+from app.infrastructure.version_cache import version_cache
+from app.service.Integrity_service import get_integrity_report
+
+metrics_router = APIRouter(
+    prefix="/metrics",
+    tags=["metrics"],
+    # operators only: the integrity report names other users' blobs
+    dependencies=[Depends(require_metrics_token)],
+)
+
+@metrics_router.get("/uploads")
+def upload_admission_metrics():
+    """In-flight uploads/bytes for this worker and the cluster, plus admission and rejection counters."""
+    return upload_admission.stats()
+
+@metrics_router.get("/version-cache")
+def version_cache_metrics():
+    """Hit/miss counters of the version metadata cache for this worker."""
+    return version_cache.stats()
+
+@metrics_router.get("/blob-cache")
+def blob_cache_metrics():
+    """Hit rate and memory use of this worker's in-memory blob cache."""
+    return blob_cache.stats()
+
+@metrics_router.get("/changes")
+def change_feed_metrics():
+    """Parked long-poll requests on this worker and change notifications sent/received."""
+    return change_notifier.stats()
+
+@metrics_router.get("/integrity")
+async def integrity_metrics(db: Annotated[AsyncSession, Depends(get_db)]):
+    """Progress of the blob integrity scrub and the missing or corrupted blobs it found (cluster-wide, from the database)."""
+    return await get_integrity_report(db)
@@ -1,5 +1,6 @@
 from pydantic import BaseModel
 from datetime import datetime
+from typing import Optional
 
 class FileVersionSchema(BaseModel):
     id: str
@@ -21,3 +22,38 @@ class FileSchema(BaseModel):
 
 class AllFileResponse(BaseModel):
     files: list[FileSchema]
+
+class FileChangeSchema(BaseModel):
+    seq: int
+    kind: str
+    file_id: str
+    file_name: str
+    version_id: Optional[str] = None
+    version_number: Optional[int] = None
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
+
+class ChangeFeedResponse(BaseModel):
+    changes: list[FileChangeSchema]
+    cursor: int
+    has_more: bool
+
+class SignedUrlResponse(BaseModel):
+    url: str
+    expires_at: datetime
+
+class SearchResultSchema(BaseModel):
+    file_id: str
+    file_name: str
+    version_id: str
+    version_number: int
+    snippet: str
+    rank: float
+
+class SearchResponse(BaseModel):
+    results: list[SearchResultSchema]
+    limit: int
+    offset: int
+    has_more: bool
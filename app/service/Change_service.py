@@ -0,0 +1,71 @@
+# service/Change_service.py
+
+import asyncio
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+from app.config import config
+from app.infrastructure.change_notifier import change_notifier
+from app.models.FileChange import FileChange
+from app.models.User import User
+import logging
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+async def record_change(db: AsyncSession, user_id: str, kind: str, file_id: str, file_name: str, version_id: Optional[str]=None, version_number: Optional[int]=None):
+    """
+    Add a change feed entry to the caller's transaction.
+
+    The user row is locked first so a user's changes commit in seq order
+    (SQLite serialises writers anyway). Otherwise a client could read seq 12,
+    move its cursor past it and never see a seq 11 that committed later.
+    Await change_notifier.publish(user_id) once the transaction commits.
+    """
+    await db.execute(select(User.id).where(User.id == user_id).with_for_update())
+    change = FileChange(
+        user_id=user_id,
+        kind=kind,
+        file_id=file_id,
+        file_name=file_name,
+        version_id=version_id,
+        version_number=version_number,
+    )
+    db.add(change)
+    await db.flush()
+    return change
+
+async def fetch_changes(db: AsyncSession, user_id: str, since: int, limit: int):
+    """Changes after `since`, oldest first; the extra row only tells whether there are more."""
+    query = (
+        select(FileChange)
+        .where(FileChange.user_id == user_id, FileChange.seq > since)
+        .order_by(FileChange.seq)
+        .limit(limit + 1)
+    )
+    result = await db.execute(query)
+    changes = list(result.scalars().all())
+    return changes[:limit], len(changes) > limit
+
+async def get_changes_since(db: AsyncSession, user_id: str, since: int, limit: int, wait: float=0):
+    """
+    A page of the user's change feed after cursor `since`.
+
+    With `wait`, an empty page is held open (up to CHANGES_MAX_WAIT_SECONDS)
+    until a change commits, then read again.
+    """
+    wait = min(max(wait, 0), config.CHANGES_MAX_WAIT_SECONDS)
+    async with change_notifier.listen(user_id) as changed:
+        changes, has_more = await fetch_changes(db, user_id, since, limit)
+        if not changes and wait:
+            # don't hold a pooled connection while parked
+            await db.close()
+            try:
+                await asyncio.wait_for(changed.wait(), timeout=wait)
+            except asyncio.TimeoutError:
+                pass
+            else:
+                changes, has_more = await fetch_changes(db, user_id, since, limit)
+
+    cursor = changes[-1].seq if changes else since
+    logger.debug("Change feed for %s after %s: %s changes, has_more=%s", user_id, since, len(changes), has_more)
+    return {"changes": changes, "cursor": cursor, "has_more": has_more}
@@ -1,11 +1,14 @@
 # service/File_service.py
 
 from fastapi import HTTPException, UploadFile, status
-from sqlalchemy import and_, func, case, Integer
-from sqlalchemy.exc import SQLAlchemyError
+from uuid import uuid4
+from sqlalchemy import and_, case, delete, exists, update
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
 from sqlalchemy.orm import selectinload
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
+from app.authentication.urlSigner import sign_blob
+from app.background.dispatch import enqueue
 from app.config import config
 from app.models.User import User
 from app.models.File import File
@@ -13,51 +16,58 @@ from app.models.FileVersion import FileVersion
 from app.utils.hash_util import hash_bytes
 import logging
 from typing import Optional
-from app.infrastructure.file_storage import save_file_locally
-from app.infrastructure.file_storage import fetch_local_file
+from app.infrastructure.file_storage import delete_local_file, save_file_locally
+from app.infrastructure.file_storage import fetch_local_file, read_local_file
+from app.infrastructure.blob_cache import blob_cache
+from app.infrastructure.version_cache import CachedVersion, version_cache
+from app.infrastructure.change_notifier import change_notifier
+from app.models.FileChange import FILE_CREATED, VERSION_CREATED
+from app.service.Change_service import record_change
 
 logger = logging.getLogger(__name__)
 
-async def get_file_by_name_or_using_content(
-    db: AsyncSession,
-    user_id: str,
-    filename: str,
-    content: Optional[bytes]=None
-):
-    logger.info("Checking for existing file with name: %s", filename)
-    # If content is given, hash it for comparison
-    hashed_content = await hash_bytes(content) if content else None
-
-    # Start query: find files by user and file name
-    query = (
-        select(
-            File,
-            # to find the last version number
-            #func.max(FileVersion.version_number).label("last_version"),
-            # to check if version is duplicate
-            #func.max((FileVersion.check_sum == hashed_content).cast(Integer)).label("is_duplicate")
-            # func.bool_or(FileVersion.check_sum==hashed_content if hashed_content else False).label("is_duplicate")
-        )
-        # .join(FileVersion, File.id == FileVersion.file_id, isouter=True)
-        .where(File.user_id == user_id, File.file_name == filename)
-        .group_by(File.id)  # group by primary key
-        .options(selectinload(File.versions))  # preload versions
-    )
-    result = await db.execute(query)
-    row = result.scalars().first()
-    # CASE 1: No file at all
-    if not row:
-        logger.info("No existing file found")
-        return None, False, 0  # brand new file
-    file_obj = row
-    if file_obj:
-        last_version = max((v.version_number for v in file_obj.versions), default=0)
-        is_duplicate = any(v.check_sum == hashed_content for v in file_obj.versions)
-    else:
-        last_version = 0
-        is_duplicate = False
-    logger.info("Found file with ID: %s, is_duplicate: %s, last_version: %s", file_obj.id, is_duplicate, last_version)
-    return file_obj, is_duplicate, last_version
+# GET /file/changes and /file/search would shadow files with these names
+RESERVED_FILE_NAMES = frozenset({"changes", "search"})
+
+async def get_or_create_file(db: AsyncSession, user_id: str, filename: str) -> tuple[str, bool]:
+    """
+    ID of the user's file with this name, creating the row if needed.
+    Returns (file_id, created). Concurrent creators race on the unique
+    (user_id, file_name) key; the loser reads the winner's row.
+    """
+    query = select(File.id).where(File.user_id == user_id, File.file_name == filename)
+    file_id = (await db.execute(query)).scalar_one_or_none()
+    if file_id:
+        return file_id, False
+
+    # end the read before writing; SQLite won't upgrade a read transaction while another writer waits
+    await db.commit()
+    logger.debug("Creating new file with name: %s for user: %s", filename, user_id)
+    new_file = File(file_name=filename, user_id=user_id)
+    db.add(new_file)
+    try:
+        await db.commit()
+        return new_file.id, True
+    except IntegrityError:
+        await db.rollback()
+        logger.debug("File %s was created concurrently", filename)
+        return (await db.execute(query)).scalar_one(), False
+
+async def discard_empty_file(db: AsyncSession, file_id: str):
+    """
+    Delete a file row that never got a version, after the upload that
+    created it failed; a concurrent upload that did commit keeps it.
+    """
+    try:
+        await db.execute(delete(File).where(File.id == file_id, ~exists().where(FileVersion.file_id == file_id)))
+        await db.commit()
+    except SQLAlchemyError as exc:
+        await db.rollback()
+        logger.error("Could not remove empty file %s: %s", file_id, exc)
+
+async def version_with_content_exists(db: AsyncSession, file_id: str, check_sum: str) -> bool:
+    query = select(FileVersion.id).where(FileVersion.file_id == file_id, FileVersion.check_sum == check_sum).limit(1)
+    return (await db.execute(query)).first() is not None
 
 async def fetch_file_or_version(db: AsyncSession, owner_id: str, file_name: str, version_id: Optional[str]=None):
     """
@@ -65,7 +75,7 @@ async def fetch_file_or_version(db: AsyncSession, owner_id: str, file_name: str,
     if version_id is not given, return the fileversion which is marked is_current
     if given version_id does not exist, return the fileversion which is marked is_current
     """
-    logger.info("Fetching file or version for owner: %s, file_name: %s, version_id: %s", owner_id, file_name, version_id)
+    logger.debug("Fetching file or version for owner: %s, file_name: %s, version_id: %s", owner_id, file_name, version_id)
     if version_id:
         priority = case(
             (FileVersion.id==version_id, 1),
@@ -86,64 +96,59 @@ async def fetch_file_or_version(db: AsyncSession, owner_id: str, file_name: str,
 
     result = await db.execute(query)
     data = result.scalars().first()
-    logger.info("Fetch result: %s", data)
+    logger.debug("Fetch result: %s", data)
     return data
 
-async def create_new_file(db: AsyncSession, user_id: str, filename: str):
-    """Create new file ID only if it does not exist."""
-    logger.info("Creating new file with name: %s for user: %s", filename, user_id)
-    new_file = File(file_name=filename,user_id = user_id)
-    db.add(new_file)
-    await db.flush()
-    await db.refresh(new_file)
-    logger.info("New file created with ID: %s", new_file.id)
-    return new_file
-
-async def mark_previous_versions_not_current(db: AsyncSession, file_obj: File):
-    """Mark all previous versions of a file as not current."""
-    logger.info("Marking previous versions as not current for file ID: %s", file_obj.id)
-    if file_obj.versions:  # list is loaded
-        for v in file_obj.versions:
-            v.is_current = False
-    await db.flush()
-    logger.info("Previous versions marked as not current")
-
-async def create_new_file_version(db: AsyncSession, file_id: str, content: bytes, lvr: int, original_filename: str):
+async def commit_new_version(db: AsyncSession, user_id: str, file_id: str, filename: str, version_id: str, check_sum: str, storage_path: str) -> FileVersion:
     """
-    Save new version of the file.
+    Record an already stored blob as the file's newest version and commit.
 
-    lvr = last_version_number
+    The version number comes from bumping files.version_counter with
+    UPDATE ... RETURNING, which also locks the file row until commit, so
+    concurrent uploads of one file get distinct numbers and exactly one
+    stays current. Only this short metadata transaction is serialised.
     """
-    logger.info("Creating new file version")
+    bump = (
+        update(File)
+        .where(File.id == file_id)
+        .values(version_counter=File.version_counter + 1)
+        .returning(File.version_counter)
+    )
+    version_number = (await db.execute(bump)).scalar_one()
+
+    await db.execute(
+        update(FileVersion)
+        .where(FileVersion.file_id == file_id, FileVersion.is_current == True)
+        .values(is_current=False)
+        .execution_options(synchronize_session=False)
+    )
     new_version = FileVersion(
+        id=version_id,
         file_id=file_id,
-        version_number=lvr+1,
-        check_sum = await hash_bytes(content),
-        storage_path="",
-        is_current=True
+        version_number=version_number,
+        check_sum=check_sum,
+        storage_path=storage_path,
+        is_current=True,
     )
     db.add(new_version)
-    logger.info("Flushing new version to database")
     await db.flush()
-    logger.info("Refreshing new version")
-    await db.refresh(new_version)
-
-    # save file logic
-    logger.info("New version flushed with ID: %s", new_version.id)
 
-    logger.info("Saving file locally for version ID: %s", new_version.id)
-    file_path = await save_file_locally(file_id, new_version.id, content, original_filename)
-    new_version.storage_path = file_path
-    logger.info(f"File saved at: {file_path}")
+    if version_number == 1:
+        await record_change(db, user_id, FILE_CREATED, file_id, filename)
+    await record_change(db, user_id, VERSION_CREATED, file_id, filename, version_id, version_number)
 
+    logger.debug("Committing version %s of file %s", version_number, file_id)
+    await db.commit()
     return new_version
 
 async def save_file_service(db: AsyncSession, user_id: str, file: UploadFile):
     """actual save service"""
-    logger.info("Starting file save service for user: %s", user_id)
+    logger.debug("Starting file save service for user: %s", user_id)
     filename = file.filename
     if not filename:
         raise HTTPException(status.HTTP_406_NOT_ACCEPTABLE, detail="Provide filename to the file")
+    if filename in RESERVED_FILE_NAMES:
+        raise HTTPException(status.HTTP_406_NOT_ACCEPTABLE, detail=f"The file name {filename!r} is reserved")
 
     max_file_size = config.MAX_FILE_SIZE
     if not file.size or file.size > max_file_size:
@@ -152,43 +157,78 @@ async def save_file_service(db: AsyncSession, user_id: str, file: UploadFile):
                 detail=f"File size exceeds limit of {max_file_size // (1024 * 1024)} MB"
             )
     file_content = await file.read()
-    logger.info("File content read, size: %s bytes", len(file_content))
+    check_sum = await hash_bytes(file_content)
+    logger.debug("File content read, size: %s bytes", len(file_content))
+    created = False
     try:
-        logger.info("Checking for existing file")
-        file_obj, existing, lvr = await get_file_by_name_or_using_content(db, user_id, filename, file_content)
-        logger.info("File check result - exists: %s, last_version: %s", existing, lvr)
-
-        # file does not exist
-        if not file_obj:
-            logger.info("Creating new file")
-            file_obj = await create_new_file(db, user_id, filename)
-            lvr=0
-
-        # version exist, avoid duplicating
-        if existing:
+        file_id, created = await get_or_create_file(db, user_id, filename)
+        if await version_with_content_exists(db, file_id, check_sum):
             logger.warning("File already exists with same content")
             raise HTTPException(status.HTTP_409_CONFLICT, detail="File is already saved")
+        # end the read transaction: nothing is held while the blob is written
+        await db.commit()
+    except SQLAlchemyError as exc:
+        await db.rollback()
+        logger.error("Error saving file: %s", exc)
+        if created:
+            await discard_empty_file(db, file_id)
+        raise HTTPException(status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Database error")
 
-        logger.info("Marking previous versions as not current")
-        if file_obj and file_obj.versions:
-            await mark_previous_versions_not_current(db, file_obj)
-
-        # save the new version
-        logger.info("Creating new file version")
-        new_version = await create_new_file_version(db, file_obj.id, file_content, lvr, filename)
+    # the blob goes to its final path before the version row exists, under a pre-generated id
+    version_id = str(uuid4())
+    try:
+        storage_path = await save_file_locally(file_id, version_id, file_content, filename)
+    except OSError as exc:
+        logger.error("Error storing file: %s", exc)
+        if created:
+            await discard_empty_file(db, file_id)
+        raise HTTPException(status.HTTP_503_SERVICE_UNAVAILABLE, detail="error in the storage")
+    logger.debug("File saved at: %s", storage_path)
 
-        logger.info("Committing database transaction")
-        await db.commit()
-        logger.info("Transaction committed, version ID: %s", new_version.id)
-        return new_version.id
+    try:
+        new_version = await commit_new_version(db, user_id, file_id, filename, version_id, check_sum, storage_path)
+    except IntegrityError:
+        # the same content was committed by a concurrent upload
+        await db.rollback()
+        await delete_local_file(storage_path)
+        logger.warning("File already exists with same content")
+        raise HTTPException(status.HTTP_409_CONFLICT, detail="File is already saved")
     except SQLAlchemyError as exc:
-        logger.info("Rolling back database transaction")
+        logger.debug("Rolling back database transaction")
         await db.rollback()
-        logger.error(f"Error saving file: {exc}")
+        await delete_local_file(storage_path)
+        logger.error("Error saving file: %s", exc)
+        if created:
+            await discard_empty_file(db, file_id)
         raise HTTPException(status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Database error")
 
-async def get_local_file_path(db: AsyncSession, owner_id: str, file_name: str, version_id: Optional[str]=None):
+    await version_cache.invalidate_current(user_id, filename)
+    await change_notifier.publish(user_id)
+    try:
+        enqueue("search.index_version", new_version.id)
+    except Exception as exc:
+        # the upload stands; search catches up on the next version or a reindex
+        logger.warning("Could not queue search indexing of version %s: %s", new_version.id, exc)
+    logger.info("Saved version %s of file %s", new_version.id, file_id)
+    return new_version.id
+
+async def resolve_version(db: AsyncSession, owner_id: str, file_name: str, version_id: Optional[str]=None) -> Optional[CachedVersion]:
+    """
+    fetch_file_or_version behind the version metadata cache.
+    Repeat lookups of a version (or of the current one, until the next upload) skip the database.
+    """
+    cached = await version_cache.get(owner_id, file_name, version_id)
+    if cached:
+        return cached
+
     version = await fetch_file_or_version(db, owner_id, file_name, version_id)
+    if not version:
+        return None
+
+    return await version_cache.put(owner_id, file_name, version_id, version)
+
+async def get_local_file_path(db: AsyncSession, owner_id: str, file_name: str, version_id: Optional[str]=None):
+    version = await resolve_version(db, owner_id, file_name, version_id)
 
     if not version:
         return None
@@ -197,12 +237,49 @@ async def get_local_file_path(db: AsyncSession, owner_id: str, file_name: str, v
 
     return file_path
 
+async def get_version_content(db: AsyncSession, owner_id: str, file_name: str, version_id: Optional[str]=None, use_blob_cache: bool=True):
+    """
+    Resolve a version for download.
+    Returns (version, content): the bytes when the blob is (or just got) cached in memory, otherwise its Path on disk.
+    """
+    version = await resolve_version(db, owner_id, file_name, version_id)
+
+    if not version:
+        return None, None
+
+    if use_blob_cache:
+        blob = blob_cache.get(version.check_sum)
+        if blob is not None:
+            return version, blob
+
+    file_path = await fetch_local_file(version.storage_path)
+
+    if file_path and use_blob_cache and blob_cache.admits(version.check_sum, file_path.stat().st_size):
+        blob = await read_local_file(file_path)
+        blob_cache.put(version.check_sum, blob)
+        return version, blob
+
+    return version, file_path
+
+async def create_signed_download(db: AsyncSession, owner_id: str, file_name: str, version_id: str):
+    """
+    Sign a download of exactly `version_id` (no fallback to the current version).
+    Returns (token, expires_at), or None if the user has no such version.
+    """
+    version = await resolve_version(db, owner_id, file_name, version_id)
+
+    if not version or version.id != version_id:
+        return None
+
+    return sign_blob(version.storage_path, version.check_sum, config.SIGNED_URL_TTL_SECONDS)
+
 async def get_all_files_of_the_user(db: AsyncSession, owner_id: str):
     query = select(User).options(selectinload(User.files)).filter_by(id=owner_id)
     result = await db.execute(query)
     user = result.scalars().first()
 
-    all_files = user.files if user else None
+    # a file whose first upload is still in flight (or failed) has no version to show yet
+    all_files = [file for file in user.files if file.versions] if user else None
 
     return all_files
 
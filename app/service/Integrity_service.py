@@ -0,0 +1,46 @@
+# service/Integrity_service.py
+
+from sqlalchemy import func
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+from app.background.integrity_scrubber import CHECKPOINT
+from app.models.FileVersion import FileVersion
+from app.models.IntegrityIssue import IntegrityIssue
+from app.models.ScrubCheckpoint import ScrubCheckpoint
+
+async def get_integrity_report(db: AsyncSession, recent: int = 20):
+    """Scrub progress, open issue counts by kind and the most recently detected open issues."""
+    checkpoint = await db.get(ScrubCheckpoint, CHECKPOINT)
+    total_versions = (await db.execute(select(func.count(FileVersion.id)))).scalar_one()
+
+    counts = await db.execute(
+        select(IntegrityIssue.kind, func.count()).where(IntegrityIssue.resolved_at.is_(None)).group_by(IntegrityIssue.kind)
+    )
+    latest = await db.execute(
+        select(IntegrityIssue).where(IntegrityIssue.resolved_at.is_(None)).order_by(IntegrityIssue.detected_at.desc()).limit(recent)
+    )
+
+    return {
+        "scrub": {
+            "versions": total_versions,
+            "cursor": checkpoint.cursor if checkpoint else None,
+            "pass_started_at": checkpoint.pass_started_at if checkpoint else None,
+            "last_pass_completed_at": checkpoint.last_pass_completed_at if checkpoint else None,
+            "passes_completed": checkpoint.passes_completed if checkpoint else 0,
+            "blobs_checked": checkpoint.blobs_checked if checkpoint else 0,
+            "bytes_checked": checkpoint.bytes_checked if checkpoint else 0,
+        },
+        "open_issues": dict(counts.all()),
+        "recent_issues": [
+            {
+                "version_id": issue.version_id,
+                "kind": issue.kind,
+                "storage_path": issue.storage_path,
+                "expected_check_sum": issue.expected_check_sum,
+                "actual_check_sum": issue.actual_check_sum,
+                "detected_at": issue.detected_at,
+                "last_checked_at": issue.last_checked_at,
+            }
+            for issue in latest.scalars().all()
+        ],
+    }
@@ -0,0 +1,23 @@
+# service/Search_service.py
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.infrastructure.search_index import get_search_index
+import logging
+
+logger = logging.getLogger(__name__)
+
+async def search_files(db: AsyncSession, user_id: str, q: str, limit: int, offset: int):
+    """
+    Rank the user's files against `q` using the full-text index only; blob storage is never read.
+    Covers the current version of each file, as far as the indexer has caught up.
+    """
+    index = get_search_index(db.bind.dialect.name)
+    # one extra row tells whether another page exists
+    rows = await index.search(db, user_id, q, limit + 1, offset)
+    logger.debug("Search %r for user %s matched %s rows", q, user_id, len(rows))
+    return {
+        "results": rows[:limit],
+        "limit": limit,
+        "offset": offset,
+        "has_more": len(rows) > limit,
+    }
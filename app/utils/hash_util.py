@@ -1,6 +1,11 @@
 # utils/hash_util.py
 
+import asyncio
 import hashlib
+from app.config import config
 
 async def hash_bytes(data: bytes) -> str:
+    # hashlib releases the GIL on large inputs, so big uploads are hashed on a thread while the loop keeps serving
+    if len(data) >= config.HASH_IN_THREAD_BYTES:
+        return await asyncio.to_thread(lambda: hashlib.sha256(data).hexdigest())
     return hashlib.sha256(data).hexdigest()
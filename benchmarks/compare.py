@@ -0,0 +1,79 @@
+# benchmarks/compare.py
+
+"""
+Diff two benchmark reports produced by `benchmarks.run`.
+
+    python -m benchmarks.compare base.json head.json --threshold 10
+
+Prints a per-scenario table of throughput and latency changes and exits
+with status 1 when any scenario regressed by more than the threshold
+(percent), so it can gate a deploy.
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+# (path into the scenario dict, True if bigger is better)
+METRICS = (
+    (("throughput_rps",), True),
+    (("latency_ms", "p50"), False),
+    (("latency_ms", "p95"), False),
+    (("latency_ms", "p99"), False),
+)
+
+
+def _get(d: dict, path: tuple[str, ...]) -> float:
+    for key in path:
+        d = d[key]
+    return float(d)
+
+
+def compare(base: dict, head: dict, threshold: float) -> tuple[list[str], list[str]]:
+    lines, regressions = [], []
+    header = f"{'scenario':<18}" + "".join(f"{'.'.join(p):>26}" for p, _ in METRICS)
+    lines.append(header)
+    for scenario, head_result in sorted(head["scenarios"].items()):
+        base_result = base["scenarios"].get(scenario)
+        if base_result is None:
+            lines.append(f"{scenario:<18}  (new)")
+            continue
+        cells = []
+        for path, higher_is_better in METRICS:
+            old, new = _get(base_result, path), _get(head_result, path)
+            change = ((new - old) / old * 100) if old else 0.0
+            worse = -change if higher_is_better else change
+            flag = "!" if worse > threshold else " "
+            if flag == "!":
+                regressions.append(f"{scenario} {'.'.join(path)}: {old:g} -> {new:g} ({change:+.1f}%)")
+            cells.append(f"{old:>9.2f} -> {new:>9.2f} {change:+6.1f}%{flag}")
+        if head_result.get("errors", 0) > base_result.get("errors", 0):
+            regressions.append(f"{scenario} errors: {base_result['errors']} -> {head_result['errors']}")
+        lines.append(f"{scenario:<18}" + "".join(f"{c:>26}" for c in cells))
+    return lines, regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("base", type=Path)
+    parser.add_argument("head", type=Path)
+    parser.add_argument("--threshold", type=float, default=10.0, help="allowed regression in percent")
+    args = parser.parse_args(argv)
+
+    base = json.loads(args.base.read_text())
+    head = json.loads(args.head.read_text())
+    if base["meta"]["params"] != head["meta"]["params"]:
+        print("warning: reports were produced with different parameters", file=sys.stderr)
+
+    lines, regressions = compare(base, head, args.threshold)
+    print(f"base {base['meta']['git']['commit'][:10]}  head {head['meta']['git']['commit'][:10]}")
+    print("\n".join(lines))
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) above {args.threshold:g}%:")
+        print("\n".join(f"  {r}" for r in regressions))
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,299 @@
+# benchmarks/harness.py
+
+"""
+Self-contained environment for benchmarking the API.
+
+Everything the app normally talks to is replaced by a local stand-in:
+SQLite in a scratch directory, a fakeredis TCP server (so the app uses
+its real Redis client code path), Celery in eager mode and a local SMTP
+sink. `bootstrap()` must run before anything under `app` is imported
+because `app.config` reads the environment at import time.
+"""
+
+import asyncio
+import contextlib
+import logging
+import math
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from benchmarks.smtp_sink import SmtpSink
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+METRICS_TOKEN = "benchmark-metrics-token"
+METRICS_HEADERS = {"Authorization": f"Bearer {METRICS_TOKEN}"}
+
+
+@dataclass
+class BenchEnvironment:
+    workdir: Path
+    redis_url: str
+    database_url: str
+    app_log: object = None
+    _redis_server: object = None
+    _smtp_sink: object = None
+
+    def app_output(self):
+        """Context manager sending the app's stdout to `workdir/app.log`."""
+        return contextlib.redirect_stdout(self.app_log)
+
+    def close(self):
+        self.app_log.close()
+        if self._smtp_sink is not None:
+            self._smtp_sink.stop()
+        if self._redis_server is not None:
+            self._redis_server.shutdown()
+            self._redis_server.server_close()
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _keep_connections_on_error_replies():
+    """
+    fakeredis' TCP server closes the connection after any error reply,
+    which real Redis doesn't; redis-py relies on surviving NOSCRIPT when
+    running Lua scripts. Hand error replies back as values instead.
+    """
+    from fakeredis._clients._sync import FakeRedisConnection
+    from redis.exceptions import ResponseError
+
+    original = FakeRedisConnection.read_response
+    if getattr(original, "_keeps_connection", False):
+        return
+
+    def read_response(self, *args, **kwargs):
+        try:
+            return original(self, *args, **kwargs)
+        except ResponseError as e:
+            return e
+
+    read_response._keeps_connection = True
+    FakeRedisConnection.read_response = read_response
+
+
+def start_fake_redis() -> tuple[object, str]:
+    """Start a fakeredis TCP server in a daemon thread, return (server, url)."""
+    from fakeredis import TcpFakeServer
+
+    class NoDelayTcpFakeServer(TcpFakeServer):
+        # The server writes each reply of a pipeline separately; with Nagle on,
+        # every reply after the first waits for the client's delayed ACK
+        # (~40 ms per pipelined call), which real Redis doesn't do.
+        def get_request(self):
+            request, address = super().get_request()
+            request.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            return request, address
+
+    _keep_connections_on_error_replies()
+    server = NoDelayTcpFakeServer(("127.0.0.1", 0))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    host, port = server.server_address
+    return server, f"redis://{host}:{port}/0"
+
+
+def bootstrap(workdir: Path) -> BenchEnvironment:
+    """
+    Point the app at local stand-ins and import it.
+
+    The working directory is switched to `workdir` so `uploads/` and the
+    SQLite file never touch the repository checkout. Anything the app
+    prints to stdout (e.g. SQL echo) is sent to `workdir/app.log`; the cost
+    of producing it is still paid, it just doesn't pollute the report.
+    """
+    workdir.mkdir(parents=True, exist_ok=True)
+    redis_server, redis_url = start_fake_redis()
+    smtp_sink = SmtpSink().start()
+    database_url = f"sqlite+aiosqlite:///{workdir / 'bench.db'}"
+
+    os.environ.update({
+        "DATABASE_URL": database_url,
+        "SECRET_KEY": "benchmark-secret-key-0123456789abcdef",
+        "JWT_ALGORITHM": "HS256",
+        "REDIS_URL": redis_url,
+        "CELERY_BROKER_URL": "memory://",
+        "CELERY_BACKEND_URL": "cache+memory://",
+        "SMTP_HOST": "127.0.0.1",
+        "SMTP_PORT": str(smtp_sink.port),
+        "SMTP_USE_SSL": "false",
+        "MAIL_ACCOUNT": "bench@example.com",
+        "MAIL_PASSWORD": "bench",
+        "METRICS_TOKEN": METRICS_TOKEN,
+    })
+    # admission limits far above any benchmark concurrency, so upload scenarios
+    # measure uploads rather than 429s; set them in the environment to test admission
+    for name, value in (("UPLOAD_MAX_CONCURRENT", 1024), ("UPLOAD_MAX_CONCURRENT_PER_USER", 1024),
+                        ("UPLOAD_MAX_BYTES_IN_FLIGHT", 1 << 30), ("UPLOAD_MAX_BYTES_IN_FLIGHT_PER_USER", 1 << 30)):
+        os.environ.setdefault(name, str(value))
+    os.chdir(workdir)
+    if str(REPO_ROOT) not in sys.path:
+        sys.path.insert(0, str(REPO_ROOT))
+
+    env = BenchEnvironment(workdir, redis_url, database_url, open(workdir / "app.log", "a", buffering=1), redis_server, smtp_sink)
+    with env.app_output():
+        import app.main  # noqa: F401
+        from app.background.celery_app import celery_app
+        from app.migrate import migrate
+        asyncio.run(migrate())
+
+    # The benchmark's own HTTP client must not add to the app's log volume.
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    celery_app.conf.task_always_eager = True
+
+    return env
+
+
+@contextlib.asynccontextmanager
+async def inprocess_client():
+    """httpx client bound to the ASGI app, with the app lifespan running."""
+    import httpx
+    from app.main import app
+
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=60) as client:
+            yield client
+
+
+@contextlib.asynccontextmanager
+async def uvicorn_client():
+    """Serve the app with uvicorn on a loopback port in a background thread."""
+    import httpx
+    import uvicorn
+    from app.main import app
+
+    port = _free_port()
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        if not thread.is_alive():
+            raise RuntimeError("uvicorn failed to start")
+        await asyncio.sleep(0.05)
+    try:
+        async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}", timeout=60) as client:
+            yield client
+    finally:
+        server.should_exit = True
+        thread.join(timeout=10)
+
+
+@contextlib.asynccontextmanager
+async def uvicorn_workers_client(workers: int, log):
+    """
+    Serve the app with `uvicorn --workers N` in a child process, the way
+    `python -m app.main` runs it; every worker is a separate interpreter
+    with its own engine, Redis clients and caches. Yields once `workers`
+    distinct pids have answered GET /ready with 200.
+    """
+    import httpx
+
+    port = _free_port()
+    env = {
+        **os.environ,
+        "PYTHONPATH": os.pathsep.join(filter(None, [str(REPO_ROOT), os.environ.get("PYTHONPATH")])),
+        "CELERY_TASK_ALWAYS_EAGER": "true",
+    }
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--host", "127.0.0.1", "--port", str(port),
+         "--workers", str(workers)],
+        env=env, stdout=log, stderr=log,
+    )
+    try:
+        async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}", timeout=60) as client:
+            ready_pids, deadline = set(), time.monotonic() + 60 + 10 * workers
+            while len(ready_pids) < workers:
+                if process.poll() is not None:
+                    raise RuntimeError(f"uvicorn exited with {process.returncode}, see app.log")
+                if time.monotonic() > deadline:
+                    raise RuntimeError(f"only {len(ready_pids)} of {workers} workers ready")
+                try:
+                    # a fresh connection each time, so the accepting worker varies
+                    response = await client.get("/ready", headers={"Connection": "close"})
+                    if response.status_code == 200:
+                        ready_pids.add(response.json()["pid"])
+                except httpx.TransportError:
+                    pass
+                await asyncio.sleep(0.05)
+            yield client
+    finally:
+        process.terminate()
+        try:
+            process.wait(timeout=30)
+        except subprocess.TimeoutExpired:
+            process.kill()
+            process.wait()
+
+
+def percentile(sorted_values: list[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(pct / 100 * len(sorted_values)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+@dataclass
+class ScenarioResult:
+    requests: int = 0
+    errors: int = 0
+    concurrency: int = 1
+    duration_s: float = 0.0
+    latencies: list[float] = field(default_factory=list)
+    error_samples: list[str] = field(default_factory=list)
+
+    def to_dict(self) -> dict:
+        lat = sorted(self.latencies)
+        ms = lambda v: round(v * 1000, 3)  # noqa: E731
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "concurrency": self.concurrency,
+            "duration_s": round(self.duration_s, 4),
+            # successful requests only: fast error replies must not read as throughput
+            "throughput_rps": round(len(self.latencies) / self.duration_s, 2) if self.duration_s else 0.0,
+            "latency_ms": {
+                "mean": ms(statistics.fmean(lat)) if lat else 0.0,
+                "p50": ms(percentile(lat, 50)),
+                "p95": ms(percentile(lat, 95)),
+                "p99": ms(percentile(lat, 99)),
+                "max": ms(lat[-1]) if lat else 0.0,
+            },
+            "error_samples": self.error_samples,
+        }
+
+
+async def run_scenario(operation, count: int, concurrency: int) -> ScenarioResult:
+    """
+    Run `operation(i)` for i in range(count) with at most `concurrency`
+    in flight. The operation returns the elapsed seconds of the part that
+    should be measured, or raises to count as an error.
+    """
+    result = ScenarioResult(concurrency=concurrency)
+    queue = iter(range(count))
+
+    async def worker():
+        for i in queue:
+            try:
+                result.latencies.append(await operation(i))
+            except Exception as e:
+                result.errors += 1
+                if len(result.error_samples) < 5:
+                    result.error_samples.append(f"{type(e).__name__}: {e}")
+            result.requests += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    result.duration_s = time.perf_counter() - started
+    return result
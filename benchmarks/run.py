@@ -0,0 +1,350 @@
+# benchmarks/run.py
+
+"""
+Reproducible load benchmark for the API.
+
+    python -m benchmarks.run --output bench.json
+    python -m benchmarks.compare old.json bench.json
+
+The app runs against SQLite, a fake Redis and eager Celery (see
+`benchmarks.harness`). Synthetic users, files and deep version histories
+are seeded through the public API, then each scenario is timed and
+reported as JSON with throughput and p50/p95/p99 latencies.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+
+from benchmarks import harness
+
+PASSWORD = "benchmark-password"
+DEEP_FILE = "deep-history.txt"
+SCENARIOS = (
+    "register",
+    "login",
+    "upload_small",
+    "upload_large",
+    "upload_duplicate",
+    "fetch_current",
+    "download_version",
+    "download_hot",
+    "download_signed",
+    "list_files",
+    "poll_changes",
+    "search",
+)
+# seeded contents start with "<user>/<file name>/v<n>", so these hit the name and body columns
+SEARCH_QUERIES = ("doc", "deep history", "txt", "v1", "hist")
+
+
+@dataclass
+class SeededUser:
+    username: str
+    email: str
+    token: str = ""
+    shallow_files: list[tuple[str, bytes]] = field(default_factory=list)
+    deep_versions: list[str] = field(default_factory=list)
+    change_cursor: int = 0
+    signed_urls: list[str] = field(default_factory=list)
+    lock: asyncio.Lock = field(default_factory=asyncio.Lock)
+
+    @property
+    def headers(self) -> dict:
+        return {"Authorization": f"Bearer {self.token}"}
+
+
+class ApiError(Exception):
+    pass
+
+
+def expect(response, *codes: int):
+    if response.status_code not in codes:
+        raise ApiError(f"{response.request.method} {response.request.url.path} -> {response.status_code}: {response.text[:200]}")
+    return response
+
+
+class Bench:
+    def __init__(self, client, redis, args):
+        self.client = client
+        self.redis = redis
+        self.args = args
+        self.rng = random.Random(args.seed)
+        self.run_id = f"{args.seed}"
+        self.users: list[SeededUser] = []
+        self.large_blob = random.Random(args.seed).randbytes(args.large_size)
+
+    def otp_for(self, email: str) -> str:
+        otp = self.redis.get(email)
+        if otp is None:
+            raise ApiError(f"no OTP stored for {email}")
+        return otp.decode("utf-8")
+
+    async def register(self, username: str, email: str):
+        expect(await self.client.post("/auth/register", json={
+            "username": username, "email": email, "password": PASSWORD, "confirm_password": PASSWORD,
+        }), 200)
+        expect(await self.client.post("/auth/register-verify", json={"email": email, "otp": self.otp_for(email)}), 200)
+
+    async def login(self, user: SeededUser) -> str:
+        expect(await self.client.post("/auth/login", json={"username": user.username, "password": PASSWORD}), 200)
+        response = expect(await self.client.post("/auth/verify", json={"email": user.email, "otp": self.otp_for(user.email)}), 200)
+        return response.json()["access_token"]
+
+    async def upload(self, user: SeededUser, name: str, content: bytes, *codes: int):
+        return expect(await self.client.post("/file/", headers=user.headers, files={"file": (name, content)}), *codes)
+
+    def text_blob(self, tag: str, size: int) -> bytes:
+        head = f"{tag}\n".encode()
+        return head + b"x" * max(0, size - len(head))
+
+    async def seed(self) -> dict:
+        args = self.args
+        started = time.perf_counter()
+        for i in range(args.users):
+            user = SeededUser(f"seed-{self.run_id}-{i}", f"seed-{self.run_id}-{i}@example.com")
+            await self.register(user.username, user.email)
+            user.token = await self.login(user)
+            self.users.append(user)
+
+        async def seed_user(user: SeededUser):
+            for f in range(args.files):
+                name = f"doc-{f}.txt"
+                content = self.text_blob(f"{user.username}/{name}/v1", args.small_size)
+                await self.upload(user, name, content, 201)
+                user.shallow_files.append((name, content))
+            for v in range(args.versions):
+                await self.upload(user, DEEP_FILE, self.text_blob(f"{user.username}/deep/v{v}", args.small_size), 201)
+            response = expect(await self.client.get(f"/file/{DEEP_FILE}", params={"all": "true"}, headers=user.headers), 200)
+            user.deep_versions = [v["id"] for v in response.json()]
+            for version_id in user.deep_versions:
+                response = expect(await self.client.get(f"/file/{DEEP_FILE}/{version_id}/signed-url", headers=user.headers), 200)
+                user.signed_urls.append(response.json()["url"])
+            while True:
+                response = expect(await self.client.get("/file/changes", params={"since": user.change_cursor, "limit": 1000}, headers=user.headers), 200)
+                user.change_cursor = response.json()["cursor"]
+                if not response.json()["has_more"]:
+                    break
+
+        await asyncio.gather(*(seed_user(u) for u in self.users))
+        return {
+            "users": len(self.users),
+            "files_per_user": args.files + 1,
+            "deep_versions_per_user": args.versions,
+            "duration_s": round(time.perf_counter() - started, 3),
+        }
+
+    def pick_user(self, i: int) -> SeededUser:
+        return self.users[i % len(self.users)]
+
+    # Each operation returns the measured seconds, or raises on an unexpected response.
+
+    async def op_register(self, i: int) -> float:
+        name = f"reg-{self.run_id}-{i}"
+        t0 = time.perf_counter()
+        await self.register(name, f"{name}@example.com")
+        return time.perf_counter() - t0
+
+    async def op_login(self, i: int) -> float:
+        user = self.pick_user(i)
+        async with user.lock:  # OTPs are per email, so one login per user at a time
+            t0 = time.perf_counter()
+            await self.login(user)
+            return time.perf_counter() - t0
+
+    async def op_upload_small(self, i: int) -> float:
+        user = self.pick_user(i)
+        name, _ = user.shallow_files[i % len(user.shallow_files)]
+        content = self.text_blob(f"{user.username}/{name}/small-{i}", self.args.small_size)
+        t0 = time.perf_counter()
+        await self.upload(user, name, content, 201)
+        return time.perf_counter() - t0
+
+    async def op_upload_large(self, i: int) -> float:
+        user = self.pick_user(i)
+        content = f"large-{i}\n".encode() + self.large_blob
+        t0 = time.perf_counter()
+        await self.upload(user, "large.bin", content, 201)
+        return time.perf_counter() - t0
+
+    async def op_upload_duplicate(self, i: int) -> float:
+        user = self.pick_user(i)
+        name, content = user.shallow_files[i % len(user.shallow_files)]
+        t0 = time.perf_counter()
+        await self.upload(user, name, content, 409)
+        return time.perf_counter() - t0
+
+    async def op_fetch_current(self, i: int) -> float:
+        user = self.pick_user(i)
+        name = DEEP_FILE if i % 2 else user.shallow_files[i % len(user.shallow_files)][0]
+        t0 = time.perf_counter()
+        expect(await self.client.get(f"/file/{name}", headers=user.headers), 200)
+        return time.perf_counter() - t0
+
+    async def op_download_version(self, i: int) -> float:
+        user = self.pick_user(i)
+        version_id = self.rng.choice(user.deep_versions)
+        t0 = time.perf_counter()
+        expect(await self.client.get(f"/file/{DEEP_FILE}/{version_id}", headers=user.headers), 200)
+        return time.perf_counter() - t0
+
+    async def op_download_hot(self, i: int) -> float:
+        # Zipf-like skew over the deep history: a few versions get most of the traffic
+        user = self.pick_user(i)
+        weights = [1 / rank ** 1.1 for rank in range(1, len(user.deep_versions) + 1)]
+        version_id = self.rng.choices(user.deep_versions, weights)[0]
+        t0 = time.perf_counter()
+        expect(await self.client.get(f"/file/{DEEP_FILE}/{version_id}", headers=user.headers), 200)
+        return time.perf_counter() - t0
+
+    async def op_download_signed(self, i: int) -> float:
+        # same traffic as download_version, through pre-issued signed URLs: no auth, no DB
+        url = self.rng.choice(self.pick_user(i).signed_urls)
+        t0 = time.perf_counter()
+        expect(await self.client.get(url), 200)
+        return time.perf_counter() - t0
+
+    async def op_list_files(self, i: int) -> float:
+        user = self.pick_user(i)
+        t0 = time.perf_counter()
+        expect(await self.client.get("/file/", headers=user.headers), 200)
+        return time.perf_counter() - t0
+
+    async def op_poll_changes(self, i: int) -> float:
+        # what a sync client does instead of list_files: ask only for what changed since its cursor
+        user = self.pick_user(i)
+        t0 = time.perf_counter()
+        response = expect(await self.client.get("/file/changes", params={"since": user.change_cursor}, headers=user.headers), 200)
+        elapsed = time.perf_counter() - t0
+        user.change_cursor = max(user.change_cursor, response.json()["cursor"])
+        return elapsed
+
+    async def op_search(self, i: int) -> float:
+        user = self.pick_user(i)
+        q = SEARCH_QUERIES[i % len(SEARCH_QUERIES)]
+        t0 = time.perf_counter()
+        expect(await self.client.get("/file/search", params={"q": q}, headers=user.headers), 200)
+        return time.perf_counter() - t0
+
+    def request_count(self, scenario: str) -> int:
+        if scenario in ("register", "login"):
+            return self.args.auth_requests
+        if scenario == "upload_large":
+            return self.args.large_requests
+        return self.args.requests
+
+    async def run(self, scenarios: list[str]) -> dict:
+        results = {}
+        for scenario in scenarios:
+            operation = getattr(self, f"op_{scenario}")
+            result = await harness.run_scenario(operation, self.request_count(scenario), self.args.concurrency)
+            results[scenario] = result.to_dict()
+            print(
+                f"{scenario:<18} {results[scenario]['throughput_rps']:>9.1f} req/s  "
+                f"p50 {results[scenario]['latency_ms']['p50']:>9.2f} ms  "
+                f"p99 {results[scenario]['latency_ms']['p99']:>9.2f} ms  errors {result.errors}",
+                file=sys.stderr,
+            )
+        return results
+
+
+def git_info() -> dict:
+    def git(*argv):
+        return subprocess.run(["git", *argv], cwd=harness.REPO_ROOT, capture_output=True, text=True).stdout.strip()
+    return {"commit": git("rev-parse", "HEAD"), "dirty": bool(git("status", "--porcelain", "--untracked-files=no"))}
+
+
+def parse_size(value: str) -> int:
+    units = {"k": 1024, "m": 1024 ** 2}
+    value = value.strip().lower().removesuffix("ib").removesuffix("b")
+    if value and value[-1] in units:
+        return int(float(value[:-1]) * units[value[-1]])
+    return int(value)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--mode", choices=("inprocess", "uvicorn", "workers"), default="inprocess",
+                        help="workers: `uvicorn --workers N` in a child process")
+    parser.add_argument("--workers", type=int, default=2, help="API processes in workers mode")
+    parser.add_argument("--output", default="-", help="JSON result path, '-' for stdout")
+    parser.add_argument("--workdir", help="scratch directory (default: a fresh temp dir, removed afterwards)")
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS), help="comma separated subset of: " + ", ".join(SCENARIOS))
+    parser.add_argument("--users", type=int, default=4)
+    parser.add_argument("--files", type=int, default=10, help="shallow files per user")
+    parser.add_argument("--versions", type=int, default=100, help="versions in each user's deep history")
+    parser.add_argument("--requests", type=int, default=200, help="requests per file scenario")
+    parser.add_argument("--auth-requests", type=int, default=20, help="requests per register/login scenario")
+    parser.add_argument("--large-requests", type=int, default=20)
+    parser.add_argument("--small-size", type=parse_size, default=1024)
+    parser.add_argument("--large-size", type=parse_size, default=5 * 1024 * 1024)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+    unknown = set(args.scenarios.split(",")) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(sorted(unknown))}")
+    return args
+
+
+async def _main(args, env: harness.BenchEnvironment) -> dict:
+    from redis import Redis
+
+    if args.mode == "workers":
+        client_context = harness.uvicorn_workers_client(args.workers, env.app_log)
+    else:
+        client_context = (harness.inprocess_client if args.mode == "inprocess" else harness.uvicorn_client)()
+    async with client_context as client:
+        bench = Bench(client, Redis.from_url(env.redis_url), args)
+        seed = await bench.seed()
+        scenarios = await bench.run([s for s in SCENARIOS if s in args.scenarios.split(",")])
+    return {"seed": seed, "scenarios": scenarios}
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    output = None if args.output == "-" else Path(args.output).resolve()
+    workdir = Path(args.workdir).resolve() if args.workdir else Path(tempfile.mkdtemp(prefix="vds-bench-"))
+    cwd = os.getcwd()
+    env = harness.bootstrap(workdir)
+    try:
+        report = {
+            "schema": 1,
+            "meta": {
+                "git": git_info(),
+                "timestamp": datetime.now(timezone.utc).isoformat(),
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "cpu_count": os.cpu_count(),
+                "mode": args.mode,
+                "params": {k: v for k, v in vars(args).items() if k not in ("output", "workdir")},
+            },
+        }
+        with env.app_output():
+            report.update(asyncio.run(_main(args, env)))
+    finally:
+        env.close()
+        os.chdir(cwd)
+        if not args.workdir:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    text = json.dumps(report, indent=2, sort_keys=True)
+    if output:
+        output.write_text(text + "\n")
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+# benchmarks/scrub.py
+
+"""
+Integrity scrub throughput and correctness check.
+
+    python -m benchmarks.scrub --blobs 100 --size 524288
+
+Uploads `--blobs` versions through the API, corrupts one stored blob,
+deletes another and puts a directory in place of a third, then runs the
+scrubber (app.background.integrity_scrubber)
+directly:
+
+- unthrottled with 1 thread and with `--threads` threads (MiB/s),
+- throttled to `--rate` bytes/s, to show the budget is held,
+- throttled with a short time budget, twice, to show a run resumes from the
+  checkpoint and the pass still covers every version exactly once,
+- after restoring the corrupted and the unreadable blob, to show their
+  issues get resolved.
+
+Prints a JSON report and exits 1 if the scrub misses or invents a problem.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks import harness
+from benchmarks.run import Bench, SeededUser, expect, parse_args as bench_args
+
+
+async def reset_checkpoint():
+    from sqlalchemy import delete
+    from app.background.worker_db import get_worker_sessionmaker
+    from app.models.ScrubCheckpoint import ScrubCheckpoint
+
+    async with get_worker_sessionmaker()() as db:
+        await db.execute(delete(ScrubCheckpoint))
+        await db.commit()
+
+
+async def scrub(threads: int, rate: int, batch: int, max_seconds: float = 3600, reset: bool = True) -> dict:
+    from app.background.integrity_scrubber import run_scrub
+    from app.config import config
+
+    if reset:
+        await reset_checkpoint()
+    config.SCRUB_THREADS, config.SCRUB_BYTES_PER_SECOND, config.SCRUB_BATCH_SIZE = threads, rate, batch
+    result = await run_scrub(max_seconds)
+    result["mib_per_s"] = round(result["bytes"] / (1 << 20) / max(result["duration_s"], 1e-9), 2)
+    result["threads"], result["rate_limit"] = threads, rate
+    return result
+
+
+async def _main(args, env: harness.BenchEnvironment) -> dict:
+    from redis import Redis
+
+    async with harness.inprocess_client() as client:
+        bench = Bench(client, Redis.from_url(env.redis_url), bench_args([]))
+        user = SeededUser("scrub", "scrub@example.com")
+        await bench.register(user.username, user.email)
+        user.token = await bench.login(user)
+
+        started = time.perf_counter()
+        uploads = asyncio.Semaphore(4)
+
+        async def upload(i: int):
+            async with uploads:
+                await bench.upload(user, f"blob-{i}.bin", bench.text_blob(f"scrub/{i}", args.size), 201)
+
+        await asyncio.gather(*(upload(i) for i in range(args.blobs)))
+        seed_s = round(time.perf_counter() - started, 3)
+
+        stored = sorted(p for p in Path("uploads").rglob("*") if p.is_file())
+        corrupted, deleted, unreadable = stored[0], stored[1], stored[2]
+        original = corrupted.read_bytes()
+        corrupted.write_bytes(original[:-1] + bytes([original[-1] ^ 0xFF]))
+        deleted.unlink()
+        unreadable_original = unreadable.read_bytes()
+        unreadable.unlink()
+        unreadable.mkdir()
+
+        report = {"params": vars(args), "seed_s": seed_s, "runs": {}}
+        report["runs"]["unthrottled_1_thread"] = await scrub(1, 0, args.batch)
+        report["runs"][f"unthrottled_{args.threads}_threads"] = await scrub(args.threads, 0, args.batch)
+        report["runs"]["throttled"] = await scrub(args.threads, args.rate, args.batch)
+
+        # a run cut short by its time budget, then one that finishes the pass
+        first = await scrub(args.threads, args.rate, args.batch, max_seconds=0.5)
+        second = await scrub(args.threads, args.rate, args.batch, reset=False)
+        report["runs"]["resumed"] = {"first": first, "second": second}
+
+        issues = expect(await client.get("/metrics/integrity", headers=harness.METRICS_HEADERS), 200).json()
+        report["integrity_after_scrub"] = issues
+
+        corrupted.write_bytes(original)
+        unreadable.rmdir()
+        unreadable.write_bytes(unreadable_original)
+        await scrub(args.threads, 0, args.batch)
+        report["open_issues_after_repair"] = expect(await client.get("/metrics/integrity", headers=harness.METRICS_HEADERS), 200).json()["open_issues"]
+
+    problems = []
+    found = {(i["kind"], Path(i["storage_path"]).name) for i in issues["recent_issues"]}
+    expected = {("mismatch", corrupted.name), ("missing", deleted.name), ("unreadable", unreadable.name)}
+    if found != expected:
+        problems.append(f"expected issues {sorted(expected)}, found {sorted(found)}")
+    if first["pass_completed"] or first["checked"] + second["checked"] != args.blobs:
+        problems.append(f"resumed pass checked {first['checked']} + {second['checked']} of {args.blobs} versions")
+    if report["open_issues_after_repair"] != {"missing": 1}:
+        problems.append(f"after repair the open issues are {report['open_issues_after_repair']}")
+    throttled = report["runs"]["throttled"]["bytes"] / report["runs"]["throttled"]["duration_s"]
+    if throttled > args.rate * 1.1:
+        problems.append(f"throttled scrub read {throttled:.0f} B/s, over the {args.rate} B/s budget")
+    report["problems"] = problems
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--blobs", type=int, default=100, help="versions to upload and scrub")
+    parser.add_argument("--size", type=int, default=512 * 1024, help="bytes per blob")
+    parser.add_argument("--threads", type=int, default=4, help="hashing threads of the parallel runs")
+    parser.add_argument("--batch", type=int, default=10, help="versions per checkpoint, small so the time-budgeted run stops mid-pass")
+    parser.add_argument("--rate", type=int, default=20 * 1024 * 1024, help="byte budget of the throttled runs")
+    args = parser.parse_args(argv)
+
+    cwd = os.getcwd()
+    workdir = Path(tempfile.mkdtemp(prefix="vds-scrub-"))
+    env = harness.bootstrap(workdir)
+    try:
+        with env.app_output():
+            report = asyncio.run(_main(args, env))
+    finally:
+        env.close()
+        os.chdir(cwd)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    print(json.dumps(report, indent=2, default=str))
+    print("FAIL: " + "; ".join(report["problems"]) if report["problems"] else "OK", file=sys.stderr)
+    sys.exit(1 if report["problems"] else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+# benchmarks/smtp_sink.py
+
+"""
+Minimal local SMTP server that accepts and discards mail.
+
+Speaks enough of RFC 5321 for smtplib (EHLO/HELO, AUTH PLAIN/LOGIN, MAIL,
+RCPT, DATA, RSET, NOOP, QUIT) and counts connections and messages.
+`connect_delay` is slept before the greeting to stand in for the TCP + TLS
+handshake a real provider costs; `auth_delay` does the same for AUTH.
+"""
+
+import socketserver
+import threading
+import time
+from dataclasses import dataclass
+
+
+@dataclass
+class SinkStats:
+    connections: int = 0
+    messages: int = 0
+
+
+class _SmtpHandler(socketserver.StreamRequestHandler):
+    server: "SmtpSink"
+
+    def reply(self, line: str):
+        self.wfile.write(f"{line}\r\n".encode())
+
+    def handle(self):
+        sink = self.server
+        time.sleep(sink.connect_delay)
+        with sink.lock:
+            sink.stats.connections += 1
+        self.reply("220 localhost SMTP sink")
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            command = line.decode("ascii", "replace").strip()
+            verb = command.split(" ", 1)[0].upper()
+            if verb == "EHLO":
+                self.reply("250-localhost")
+                self.reply("250-AUTH PLAIN LOGIN")
+                self.reply("250 8BITMIME")
+            elif verb == "HELO":
+                self.reply("250 localhost")
+            elif verb == "AUTH":
+                time.sleep(sink.auth_delay)
+                parts = command.split()
+                if parts[1].upper() == "LOGIN" and len(parts) == 2:
+                    self.reply("334 VXNlcm5hbWU6")
+                    self.rfile.readline()
+                if parts[1].upper() == "LOGIN":
+                    self.reply("334 UGFzc3dvcmQ6")
+                    self.rfile.readline()
+                self.reply("235 2.7.0 Authentication successful")
+            elif verb in ("MAIL", "RCPT", "RSET", "NOOP"):
+                self.reply("250 OK")
+            elif verb == "DATA":
+                self.reply("354 End data with <CR><LF>.<CR><LF>")
+                while self.rfile.readline() not in (b".\r\n", b""):
+                    pass
+                with sink.lock:
+                    sink.stats.messages += 1
+                self.reply("250 OK queued")
+            elif verb == "QUIT":
+                self.reply("221 Bye")
+                return
+            else:
+                self.reply("502 Command not implemented")
+
+
+class SmtpSink(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, connect_delay: float = 0.0, auth_delay: float = 0.0):
+        super().__init__((host, port), _SmtpHandler)
+        self.connect_delay = connect_delay
+        self.auth_delay = auth_delay
+        self.stats = SinkStats()
+        self.lock = threading.Lock()
+
+    @property
+    def port(self) -> int:
+        return self.server_address[1]
+
+    def start(self) -> "SmtpSink":
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
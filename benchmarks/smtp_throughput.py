@@ -0,0 +1,79 @@
+# benchmarks/smtp_throughput.py
+
+"""
+OTP delivery throughput against a local SMTP sink.
+
+    python -m benchmarks.smtp_throughput --emails 200 --connect-delay 0.03
+
+Sends OTPs through `OtpService` the way the Celery task does and reports
+emails/sec for two modes: one connection per email (SMTP_POOL_SIZE=0,
+the pre-pool behaviour) and pooled connections. `--connect-delay`/`--auth-delay` add latency to the
+sink's greeting and AUTH to stand in for a remote provider's TLS
+handshake and login round trips.
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks import harness
+from benchmarks.smtp_sink import SmtpSink
+
+
+def measure(service, emails: list[str], mode: str, threads: int) -> float:
+    started = time.perf_counter()
+    with ThreadPoolExecutor(threads) as executor:
+        results = list(executor.map(service.send_otp, emails))
+    failed = sum(r["status"] != "SUCCESS" for r in results)
+    elapsed = time.perf_counter() - started
+    if failed:
+        raise RuntimeError(f"{failed} OTP sends failed in {mode} mode")
+    return elapsed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--emails", type=int, default=200)
+    parser.add_argument("--threads", type=int, default=2, help="concurrent senders, like Celery worker concurrency")
+    parser.add_argument("--pool-size", type=int, default=2)
+    parser.add_argument("--connect-delay", type=float, default=0.03)
+    parser.add_argument("--auth-delay", type=float, default=0.03)
+    args = parser.parse_args(argv)
+
+    os.environ.setdefault("REDIS_URL", "redis://127.0.0.1:6379/0")
+    sys.path.insert(0, str(harness.REPO_ROOT))
+    from redis import Redis
+    from app.background.OtpService import OtpService
+    from app.background.smtp_pool import SmtpConnectionPool
+
+    redis_server, redis_url = harness.start_fake_redis()
+    sink = SmtpSink(connect_delay=args.connect_delay, auth_delay=args.auth_delay).start()
+    redis = Redis.from_url(redis_url)
+    emails = [f"user{i}@example.com" for i in range(args.emails)]
+
+    report = {"params": vars(args), "modes": {}}
+    try:
+        for mode, pool_size in (("per_email_connection", 0), ("pooled", args.pool_size)):
+            pool = SmtpConnectionPool("127.0.0.1", sink.port, "bench@example.com", "bench", use_ssl=False, size=pool_size)
+            service = OtpService(redis, "bench@example.com", smtp_pool=pool)
+            connections_before = sink.stats.connections
+            elapsed = measure(service, emails, mode, args.threads)
+            pool.close()
+            report["modes"][mode] = {
+                "emails": len(emails),
+                "duration_s": round(elapsed, 4),
+                "emails_per_s": round(len(emails) / elapsed, 2),
+                "smtp_connections": sink.stats.connections - connections_before,
+            }
+            print(f"{mode:<22} {len(emails) / elapsed:>9.1f} emails/s  connections {report['modes'][mode]['smtp_connections']}", file=sys.stderr)
+    finally:
+        sink.stop()
+        redis_server.shutdown()
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+# benchmarks/startup.py
+
+"""
+Import and startup time of the API.
+
+    python -m benchmarks.startup --runs 5
+
+Each run is a fresh interpreter (nothing cached in-process) against the same
+SQLite file and a fake Redis, measuring:
+
+- import_ms:  `import app.main`
+- startup_ms: the lifespan startup, i.e. until uvicorn would accept requests
+- first_request_ms: GET / right after startup
+- ready_ms:   from the start of the lifespan until GET /ready returns 200
+              (pools opened, clients warmed), when the app has /ready
+
+The schema is created once up front with `python -m app.migrate`. Medians
+over the runs are printed as JSON.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+RESULT_PREFIX = "STARTUP-RESULT "
+
+
+async def _measure() -> dict:
+    started = time.perf_counter()
+    import app.main
+    result = {"import_ms": (time.perf_counter() - started) * 1000}
+
+    import httpx
+
+    app = app.main.app
+    started = time.perf_counter()
+    async with app.router.lifespan_context(app):
+        result["startup_ms"] = (time.perf_counter() - started) * 1000
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+            t0 = time.perf_counter()
+            (await client.get("/")).raise_for_status()
+            result["first_request_ms"] = (time.perf_counter() - t0) * 1000
+            while True:
+                status = (await client.get("/ready")).status_code
+                if status == 404:
+                    break
+                if status == 200:
+                    result["ready_ms"] = (time.perf_counter() - started) * 1000
+                    break
+                if time.perf_counter() - started > 30:
+                    raise RuntimeError("not ready after 30 s")
+                await asyncio.sleep(0.005)
+    return result
+
+
+def child():
+    result = asyncio.run(_measure())
+    # the app may log to stdout as well, so the result line is tagged
+    print(RESULT_PREFIX + json.dumps(result), flush=True)
+
+
+def run_child(env: dict, workdir: Path, *args: str) -> subprocess.CompletedProcess:
+    return subprocess.run(
+        [sys.executable, *args], cwd=workdir, env=env, capture_output=True, text=True, check=True,
+    )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+    if args.child:
+        return child()
+
+    from benchmarks.harness import start_fake_redis
+
+    redis_server, redis_url = start_fake_redis()
+    workdir = Path(tempfile.mkdtemp(prefix="vds-startup-"))
+    env = {
+        **os.environ,
+        "PYTHONPATH": os.pathsep.join(filter(None, [str(REPO_ROOT), os.environ.get("PYTHONPATH")])),
+        "DATABASE_URL": f"sqlite+aiosqlite:///{workdir / 'startup.db'}",
+        "SECRET_KEY": "benchmark-secret-key-0123456789abcdef",
+        "JWT_ALGORITHM": "HS256",
+        "REDIS_URL": redis_url,
+        "CELERY_BROKER_URL": "memory://",
+        "CELERY_BACKEND_URL": "cache+memory://",
+        "LOG_LEVEL": "WARNING",
+    }
+    report = {"runs": args.runs}
+    try:
+        if (REPO_ROOT / "app" / "migrate.py").exists():
+            t0 = time.perf_counter()
+            run_child(env, workdir, "-m", "app.migrate")
+            report["migrate_ms"] = round((time.perf_counter() - t0) * 1000, 1)
+
+        samples = []
+        for _ in range(args.runs):
+            output = run_child(env, workdir, "-m", "benchmarks.startup", "--child").stdout
+            line = next(l for l in output.splitlines() if l.startswith(RESULT_PREFIX))
+            samples.append(json.loads(line[len(RESULT_PREFIX):]))
+        for key in ("import_ms", "startup_ms", "first_request_ms", "ready_ms"):
+            values = [s[key] for s in samples if key in s]
+            if values:
+                report[key] = {"median": round(statistics.median(values), 1), "min": round(min(values), 1), "max": round(max(values), 1)}
+    finally:
+        redis_server.shutdown()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
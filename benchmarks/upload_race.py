@@ -0,0 +1,121 @@
+# benchmarks/upload_race.py
+
+"""
+Concurrency stress test for version numbering.
+
+    python -m benchmarks.upload_race --uploads 100
+
+Fires `--uploads` parallel uploads of one file name (distinct contents)
+for a single user, plus `--duplicates` parallel uploads of one identical
+content, then reads the version history back through the API and checks:
+
+- version numbers are unique and exactly 1..N, one per accepted upload,
+- exactly one version is current, and it is the highest,
+- identical content is stored once and every other copy gets 409.
+
+Prints a JSON report and exits 1 if any check fails.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+from collections import Counter
+from pathlib import Path
+
+from benchmarks import harness
+from benchmarks.run import Bench, SeededUser, expect, parse_args as bench_args
+
+RACE_FILE = "race.txt"
+DUPLICATE_FILE = "same-content.txt"
+
+
+async def upload_all(bench: Bench, user, name: str, contents: list[bytes]) -> Counter:
+    async def one(content: bytes) -> int:
+        response = await bench.client.post("/file/", headers=user.headers, files={"file": (name, content)})
+        return response.status_code
+    return Counter(await asyncio.gather(*(one(c) for c in contents)))
+
+
+def check_history(versions: list[dict], accepted: int) -> list[str]:
+    problems = []
+    numbers = [v["version_number"] for v in versions]
+    duplicated = sorted(n for n, count in Counter(numbers).items() if count > 1)
+    if duplicated:
+        problems.append(f"duplicate version numbers: {duplicated}")
+    if sorted(numbers) != list(range(1, accepted + 1)):
+        problems.append(f"expected versions 1..{accepted}, got {sorted(numbers)}")
+    current = [v["version_number"] for v in versions if v["is_current"]]
+    if len(current) != 1:
+        problems.append(f"{len(current)} versions marked current: {current}")
+    elif numbers and current[0] != max(numbers):
+        problems.append(f"current version is {current[0]}, not the latest {max(numbers)}")
+    return problems
+
+
+async def _main(args, env: harness.BenchEnvironment) -> dict:
+    from redis import Redis
+
+    async with harness.inprocess_client() as client:
+        bench = Bench(client, Redis.from_url(env.redis_url), bench_args([]))
+        user = SeededUser("race", "race@example.com")
+        await bench.register(user.username, user.email)
+        user.token = await bench.login(user)
+
+        started = time.perf_counter()
+        race = await upload_all(bench, user, RACE_FILE, [f"race upload {i}\n".encode() for i in range(args.uploads)])
+        race_elapsed = time.perf_counter() - started
+        duplicates = await upload_all(bench, user, DUPLICATE_FILE, [b"identical content\n"] * args.duplicates)
+
+        report = {"params": vars(args), "checks": {}}
+        for name, statuses, expected_accepted in ((RACE_FILE, race, None), (DUPLICATE_FILE, duplicates, 1)):
+            response = expect(await client.get(f"/file/{name}", params={"all": "true"}, headers=user.headers), 200)
+            versions = response.json()
+            accepted = statuses.get(201, 0)
+            problems = check_history(versions, accepted)
+            if expected_accepted is not None and accepted != expected_accepted:
+                problems.append(f"{accepted} uploads of identical content accepted, expected {expected_accepted}")
+            if expected_accepted is None and accepted != args.uploads:
+                problems.append(f"only {accepted} of {args.uploads} distinct uploads accepted")
+            report["checks"][name] = {
+                "statuses": {str(code): count for code, count in sorted(statuses.items())},
+                "versions_stored": len(versions),
+                "problems": problems,
+            }
+        report["race_uploads_per_s"] = round(args.uploads / race_elapsed, 2)
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--uploads", type=int, default=100, help="parallel uploads of distinct content to one file")
+    parser.add_argument("--duplicates", type=int, default=20, help="parallel uploads of identical content to another file")
+    args = parser.parse_args(argv)
+
+    # admission control would otherwise turn most of the burst away with 429
+    os.environ["UPLOAD_MAX_CONCURRENT"] = os.environ["UPLOAD_MAX_CONCURRENT_PER_USER"] = str(args.uploads + args.duplicates)
+    os.environ["UPLOAD_MAX_BYTES_IN_FLIGHT"] = os.environ["UPLOAD_MAX_BYTES_IN_FLIGHT_PER_USER"] = str(1 << 30)
+
+    cwd = os.getcwd()
+    workdir = Path(tempfile.mkdtemp(prefix="vds-race-"))
+    env = harness.bootstrap(workdir)
+    try:
+        with env.app_output():
+            report = asyncio.run(_main(args, env))
+    finally:
+        env.close()
+        os.chdir(cwd)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    print(json.dumps(report, indent=2))
+    failed = any(check["problems"] for check in report["checks"].values())
+    print("FAIL" if failed else "OK: no duplicate or missing version numbers, one current version", file=sys.stderr)
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+# benchmarks/workers.py
+
+"""
+Throughput of the multi-process serving mode across worker counts.
+
+    python -m benchmarks.workers --workers 1,2,4
+
+Runs `benchmarks.run --mode workers` once per worker count, each against a
+fresh scratch environment, and prints req/s per scenario side by side
+together with the CPU count. The default workload is the benchmark's,
+scaled down; extra arguments after `--` go to benchmarks.run unchanged.
+Exits with status 1 if any scenario had errors, since its throughput
+then isn't comparable.
+Scaling is bounded by the cores available and, for uploads, by SQLite's
+single writer; with one CPU the workers only take turns, so more of them
+can't be faster.
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+DEFAULT_RUN_ARGS = [
+    "--users", "4", "--files", "5", "--versions", "20",
+    "--requests", "200", "--auth-requests", "16", "--large-requests", "10",
+    "--concurrency", "16",
+]
+
+
+def run(workers: int, run_args: list[str]) -> dict:
+    with tempfile.TemporaryDirectory(prefix="vds-workers-") as tmp:
+        output = Path(tmp) / "bench.json"
+        result = subprocess.run(
+            [sys.executable, "-m", "benchmarks.run", "--mode", "workers", "--workers", str(workers),
+             "--output", str(output), *run_args],
+            cwd=REPO_ROOT, capture_output=True, text=True,
+        )
+        if result.returncode:
+            sys.exit(f"benchmarks.run with {workers} workers failed:\n{result.stderr}")
+        return json.loads(output.read_text())
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", default="1,2,4", help="comma separated worker counts")
+    parser.add_argument("run_args", nargs="*", help="passed to benchmarks.run (after --)")
+    args = parser.parse_args(argv)
+    counts = [int(n) for n in args.workers.split(",")]
+
+    reports = {n: run(n, args.run_args or DEFAULT_RUN_ARGS) for n in counts}
+    scenarios = list(next(iter(reports.values()))["scenarios"])
+    table = {
+        scenario: {f"{n}_workers": reports[n]["scenarios"][scenario]["throughput_rps"] for n in counts}
+        for scenario in scenarios
+    }
+    errors = {
+        f"{scenario} with {n} workers": reports[n]["scenarios"][scenario]["errors"]
+        for scenario in scenarios for n in counts if reports[n]["scenarios"][scenario]["errors"]
+    }
+    print(json.dumps({"cpu_count": os.cpu_count(), "throughput_rps": table, "errors": errors}, indent=2))
+
+    if (os.cpu_count() or 1) < max(counts):
+        print(f"note: {os.cpu_count()} CPU(s) for up to {max(counts)} workers; this can't show multi-core scaling",
+              file=sys.stderr)
+    width = max(map(len, scenarios))
+    print(f"{'':{width}}" + "".join(f"{f'{n} workers':>14}" for n in counts), file=sys.stderr)
+    for scenario, row in table.items():
+        print(f"{scenario:{width}}" + "".join(f"{rps:>10.1f} r/s" for rps in row.values()), file=sys.stderr)
+    if errors:
+        sys.exit("errors, throughput not comparable: " + ", ".join(f"{where}: {count}" for where, count in errors.items()))
+
+
+if __name__ == "__main__":
+    main()